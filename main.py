@@ -1,11 +1,28 @@
 
 import os
+import argparse
 import pandas as pd
 import json
 import shutil
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
-from src.extractors.document_loader import ESGDocumentLoader
+from src.extractors.document_loader import ESGDocumentLoader, VERSAO_CHUNKS
+from src.extractors.chunk_dedup import ChunkDeduplicator
 from src.agents.ai_processor import ESGMetricProcessor
+from src.agents.client_registry import ClientRegistry
+from src.agents.rate_limiter import RateLimiter
+from src.utils.data_repository import ChunkJsonlWriter
+from src.utils.extraction_cache import ExtractionCache
+from src.utils.cache_store import SQLiteLRUStore
+from src.utils.hashing import hash_arquivo
+from src.utils.metric_catalog import MetricCatalog
+from src.utils.run_journal import RunJournal
+from src.utils.manifest import ProcessingManifest
+from src.utils.work_queue import WorkQueue
+from src.utils.folder_watcher import FolderWatcher
 import dotenv
 import json
 
@@ -15,9 +32,92 @@ dotenv.load_dotenv()
 DIR_RAW = "./data/raw"
 DIR_PROCESSED = "./data/processed"
 DIR_OUTPUT = "./data/output"
+DIR_CACHE = "./data/cache"
+
+# Cache de extração por página (texto de layout + chunks), com despejo LRU
+CAMINHO_CACHE_EXTRACAO = os.path.join(DIR_CACHE, "extracao.sqlite")
+CACHE_EXTRACAO_MB = int(os.getenv("ESG_CACHE_EXTRACAO_MB", "512"))
+
+# Cache de embeddings por modelo + hash do texto
+CAMINHO_CACHE_EMBEDDINGS = os.path.join(DIR_CACHE, "embeddings.sqlite")
+CACHE_EMBEDDINGS_MB = int(os.getenv("ESG_CACHE_EMBEDDINGS_MB", "1024"))
+
+# Cache de respostas do LLM (descoberta e extração)
+CAMINHO_CACHE_LLM = os.path.join(DIR_CACHE, "llm.sqlite")
+CACHE_LLM_MB = int(os.getenv("ESG_CACHE_LLM_MB", "256"))
+CACHE_LLM_TTL_HORAS = int(os.getenv("ESG_CACHE_LLM_TTL_HORAS", str(24 * 30)))
+
+# Coleções Chroma persistentes, uma por hash de conteúdo do PDF
+DIR_COLECOES = os.path.join(DIR_CACHE, "chroma")
+# Backend vetorial: "chroma" ou "numpy" (índice exato em memória, salvo em memmap)
+VETOR_BACKEND = os.getenv("ESG_VETOR_BACKEND", "chroma")
+DIR_INDICES_NUMPY = os.path.join(DIR_CACHE, "numpy")
+
+# Manifesto dos PDFs já processados (hash do conteúdo -> páginas, versão, artefatos).
+# Fica fora de DIR_CACHE: não é apagado pelo "cache purge"
+CAMINHO_MANIFESTO = "./data/manifesto.sqlite"
+# Suba a versão quando uma mudança no pipeline exigir reprocessar os PDFs já concluídos
+PIPELINE_VERSAO = f"1.{VERSAO_CHUNKS}"
+
+# Diários de execução por hash do PDF (etapas e métricas concluídas, para --resume)
+DIR_DIARIOS = os.path.join(DIR_CACHE, "diarios")
+
+# Paralelismo da extração de páginas (1 = leitura sequencial)
+LOADER_WORKERS = int(os.getenv("ESG_LOADER_WORKERS", "1"))
+LOADER_PAGINAS_POR_LOTE = int(os.getenv("ESG_LOADER_PAGINAS_POR_LOTE", "10"))
+
+# Modo de memória limitada para relatórios muito longos (reabre o PDF a cada janela)
+LOADER_MEMORIA_LIMITADA = os.getenv("ESG_LOADER_MEMORIA_LIMITADA", "0") == "1"
+LOADER_PAGINAS_POR_JANELA = int(os.getenv("ESG_LOADER_PAGINAS_POR_JANELA", "25"))
+
+# Extração concorrente das métricas e limites da API do LLM (0 = sem limite)
+LLM_CONCORRENCIA = int(os.getenv("ESG_LLM_CONCORRENCIA", "1"))
+LLM_RPM = int(os.getenv("ESG_LLM_RPM", "0")) or None
+LLM_TPM = int(os.getenv("ESG_LLM_TPM", "0")) or None
+# "individual" (um prompt por métrica) ou "agrupado" (métricas com contexto em comum juntas)
+LLM_MODO_EXTRACAO = os.getenv("ESG_LLM_MODO_EXTRACAO", "individual")
+# Orçamento de tokens do contexto de cada prompt de extração
+LLM_ORCAMENTO_CONTEXTO = int(os.getenv("ESG_LLM_ORCAMENTO_CONTEXTO", "1500"))
+
+# Catálogo de métricas por indicador GRI (colunas estáveis do CSV final)
+CAMINHO_CATALOGO = "src/utils/catalogo_metricas.json"
+# Métricas novas da descoberta (--expandir-catalogo), somadas ao catálogo na leitura
+CAMINHO_CATALOGO_EXPANSOES = "./data/catalogo_expansoes.json"
+# Extração híbrida: valores inequívocos do loader dispensam o LLM
+EXTRACAO_HIBRIDA = os.getenv("ESG_EXTRACAO_HIBRIDA", "0") == "1"
+
+# Backend do LLM e dos embeddings: "openai", "gravar"/"reproduzir" (cassete) ou "falso" (offline)
+LLM_BACKEND = os.getenv("ESG_LLM_BACKEND", "openai")
+CAMINHO_CASSETE = os.getenv("ESG_CASSETE", os.path.join(DIR_CACHE, "cassete.jsonl"))
+LATENCIA_SIMULADA = float(os.getenv("ESG_LATENCIA_SIMULADA", "0"))
+
+# Pool HTTP compartilhado pelos clientes da OpenAI de todos os arquivos
+HTTP_MAX_CONEXOES = int(os.getenv("ESG_HTTP_MAX_CONEXOES", "20"))
+HTTP_MAX_CONEXOES_OCIOSAS = int(os.getenv("ESG_HTTP_MAX_CONEXOES_OCIOSAS", "10"))
+HTTP_KEEPALIVE_S = float(os.getenv("ESG_HTTP_KEEPALIVE_S", "60"))
+HTTP_TIMEOUT_S = float(os.getenv("ESG_HTTP_TIMEOUT_S", "60"))
+HTTP_TIMEOUT_CONEXAO_S = float(os.getenv("ESG_HTTP_TIMEOUT_CONEXAO_S", "10"))
+
+# Modo em lote (--paralelo): extração dos PDFs em processos, etapa LLM em threads
+LOTE_WORKERS_EXTRACAO = int(os.getenv("ESG_LOTE_WORKERS_EXTRACAO", str(max(1, (os.cpu_count() or 2) // 2))))
+LOTE_WORKERS_LLM = int(os.getenv("ESG_LOTE_WORKERS_LLM", "4"))
+
+# Modo daemon (python main.py daemon): observa DIR_RAW e processa pela fila persistente
+CAMINHO_FILA = "./data/fila.sqlite"
+CAMINHO_STATUS_DAEMON = "./data/daemon_status.json"
+CAMINHO_TRAVA_DAEMON = "./data/daemon.lock"
+DAEMON_WORKERS = int(os.getenv("ESG_DAEMON_WORKERS", "2"))
+# Varredura da pasta (sem watchdog) e atualização do arquivo de status
+DAEMON_INTERVALO_S = float(os.getenv("ESG_DAEMON_INTERVALO_S", "5"))
+# Tempo sem mudanças de tamanho/data para um PDF ser considerado completo
+DAEMON_ESTABILIDADE_S = float(os.getenv("ESG_DAEMON_ESTABILIDADE_S", "2"))
+DAEMON_MAX_TENTATIVAS = int(os.getenv("ESG_DAEMON_MAX_TENTATIVAS", "3"))
+# Espera antes de uma nova tentativa: dobra a cada falha, até o máximo
+DAEMON_ESPERA_BASE_S = float(os.getenv("ESG_DAEMON_ESPERA_BASE_S", "30"))
+DAEMON_ESPERA_MAX_S = float(os.getenv("ESG_DAEMON_ESPERA_MAX_S", "3600"))
 
 # Criar pastas caso não existam
-for folder in [DIR_RAW, DIR_PROCESSED, DIR_OUTPUT]:
+for folder in [DIR_RAW, DIR_PROCESSED, DIR_OUTPUT, DIR_CACHE]:
     os.makedirs(folder, exist_ok=True)
 
 
@@ -29,8 +129,32 @@ def carregar_configuracao():
 # Agora, em vez de definir o dicionário manualmente, você faz:
 CONFIG_ESG = carregar_configuracao()
 
+
+def criar_registro_clientes():
+    return ClientRegistry(
+        max_conexoes=HTTP_MAX_CONEXOES,
+        max_conexoes_ociosas=HTTP_MAX_CONEXOES_OCIOSAS,
+        keepalive_s=HTTP_KEEPALIVE_S,
+        timeout_s=HTTP_TIMEOUT_S,
+        timeout_conexao_s=HTTP_TIMEOUT_CONEXAO_S,
+    )
+
+
+def criar_loader(n_workers=LOADER_WORKERS):
+    return ESGDocumentLoader(
+        CONFIG_ESG,
+        n_workers=n_workers,
+        paginas_por_lote=LOADER_PAGINAS_POR_LOTE,
+        cache=ExtractionCache(CAMINHO_CACHE_EXTRACAO, CACHE_EXTRACAO_MB),
+        memoria_limitada=LOADER_MEMORIA_LIMITADA,
+        paginas_por_janela=LOADER_PAGINAS_POR_JANELA,
+    )
+
+
 class ESGAutomationOrchestrator:
-    def __init__(self, pdf_path):
+    def __init__(self, pdf_path, forcar_atualizacao=False, expandir_catalogo=False, backend=LLM_BACKEND,
+                 caminho_cassete=CAMINHO_CASSETE, latencia_simulada=LATENCIA_SIMULADA, loader_workers=LOADER_WORKERS,
+                 catalogo=None, limitador=None, loader=None, registro_clientes=None, retomar=False, pdf_hash=None):
         self.pdf_path = pdf_path
         self.filename = os.path.basename(pdf_path)
         self.api_key = os.getenv("OPENAI_API_KEY")
@@ -38,8 +162,75 @@ class ESGAutomationOrchestrator:
         # DEFINIÇÃO FALTANTE:
         self.output_dir = DIR_OUTPUT 
         
-        self.loader = ESGDocumentLoader(CONFIG_ESG)
-        self.processor = ESGMetricProcessor(self.api_key)
+        # Loader e clientes podem vir de fora para serem reaproveitados entre arquivos
+        self.loader = loader or criar_loader(loader_workers)
+        self.deduplicator = ChunkDeduplicator()
+        # Sem retomar, o diário anterior deste PDF é descartado na primeira abertura
+        self.retomar = retomar
+        self._diario = None
+        self._pdf_hash = pdf_hash
+        # O processador (clientes do LLM e embeddings) só é criado na etapa 4, para
+        # que os processos que apenas extraem o PDF não o construam
+        self._processor = None
+        self._opcoes_processor = dict(
+            forcar_atualizacao=forcar_atualizacao,
+            expandir_catalogo=expandir_catalogo,
+            backend=backend,
+            caminho_cassete=caminho_cassete,
+            latencia_simulada=latencia_simulada,
+            catalogo=catalogo,
+            limitador=limitador,
+            registro_clientes=registro_clientes,
+        )
+
+    @property
+    def pdf_hash(self):
+        if self._pdf_hash is None:
+            self._pdf_hash = hash_arquivo(self.pdf_path)
+        return self._pdf_hash
+
+    @property
+    def diario(self):
+        if self._diario is None:
+            self._diario = RunJournal(DIR_DIARIOS, self.pdf_hash)
+            if not self.retomar:
+                self._diario.reiniciar()
+            elif self._diario.etapa("chunks") is not None:
+                print(self._diario.resumo())
+        return self._diario
+
+    @property
+    def processor(self):
+        if self._processor is None:
+            self._processor = self._criar_processor(**self._opcoes_processor)
+        return self._processor
+
+    def _criar_processor(self, forcar_atualizacao, expandir_catalogo, backend, caminho_cassete,
+                         latencia_simulada, catalogo, limitador, registro_clientes):
+        return ESGMetricProcessor(
+            self.api_key,
+            caminho_cache_embeddings=CAMINHO_CACHE_EMBEDDINGS,
+            cache_embeddings_mb=CACHE_EMBEDDINGS_MB,
+            dir_colecoes=DIR_INDICES_NUMPY if VETOR_BACKEND == "numpy" else DIR_COLECOES,
+            max_concorrencia=LLM_CONCORRENCIA,
+            requisicoes_por_minuto=LLM_RPM,
+            tokens_por_minuto=LLM_TPM,
+            modo_extracao=LLM_MODO_EXTRACAO,
+            caminho_cache_llm=CAMINHO_CACHE_LLM,
+            cache_llm_mb=CACHE_LLM_MB,
+            ttl_cache_llm_horas=CACHE_LLM_TTL_HORAS,
+            forcar_atualizacao=forcar_atualizacao,
+            backend_vetorial=VETOR_BACKEND,
+            orcamento_tokens_contexto=LLM_ORCAMENTO_CONTEXTO,
+            catalogo=catalogo or MetricCatalog(CAMINHO_CATALOGO, CAMINHO_CATALOGO_EXPANSOES),
+            expandir_catalogo=expandir_catalogo,
+            extracao_hibrida=EXTRACAO_HIBRIDA,
+            backend=backend,
+            caminho_cassete=caminho_cassete,
+            latencia_simulada=latencia_simulada,
+            limitador=limitador,
+            registro_clientes=registro_clientes,
+        )
 
     # def run_pipeline(self):
     #     print(f"\n{'-'*50}\n🚀 Processando arquivo: {self.filename}")
@@ -76,43 +267,77 @@ class ESGAutomationOrchestrator:
 
     def run_pipeline(self):
         print(f"\n{'-'*50}\n🚀 Processando arquivo: {self.filename}")
-        
-        # --- ETAPA 1: Extração Bruta (PDF -> Memória) ---
-        raw_data = self.loader.extract_content(self.pdf_path, CONFIG_ESG)
-        
-        if not raw_data or not raw_data.get("chunks"):
-            print(f"⚠️ {self.filename}: Nenhum conteúdo relevante.")
+        if self.diario.concluida("concluido"):
+            print(f"📓 {self.filename} já foi concluído: {self.diario.etapa('concluido')['csv']}")
+            return True
+        chunks = self.extrair_chunks()
+        if not chunks:
             return False
+        self.processar_chunks(chunks)
+        return True
 
-        # --- ETAPA 2: Persistência (Salvamento do JSON) ---
-        # Salvamos o arquivo no disco primeiro
-        json_path = self._save_json_chunks(raw_data)
-        
-        # --- ETAPA 3: Leitura do JSON (Aqui a mágica acontece) ---
-        # Agora o sistema lê o arquivo que acabou de salvar para processar
-        print(f"📖 Lendo dados a partir do JSON: {os.path.basename(json_path)}")
-        with open(json_path, "r", encoding="utf-8") as f:
-            dados_para_processar = json.load(f)
-        
-        # --- ETAPA 4: Processamento LLM (Dados do JSON -> Dados Estruturados) ---
+    def extrair_chunks(self):
+        """Etapas 1 a 3 (só CPU e disco): PDF -> JSONL de auditoria -> chunks deduplicados."""
+        # --- ETAPA 1 e 2: Extração em streaming (PDF -> JSONL de auditoria) ---
+        # Cada página é gravada no JSONL assim que termina; os chunks seguem
+        # em memória direto para o LLM, sem reler o arquivo de auditoria.
+        # O LLM só começa com o documento inteiro lido: a descoberta e a busca
+        # vetorial de cada métrica olham os chunks de todas as páginas
+        etapa = self.diario.etapa("chunks")
+        if etapa is not None and (not etapa["total"] or os.path.exists(etapa["jsonl"])):
+            # Retomada: o JSONL de auditoria já tem os chunks brutos deste PDF
+            chunks = list(ChunkJsonlWriter.read(etapa["jsonl"])) if etapa["total"] else []
+            print(f"📓 {len(chunks)} chunks retomados de {os.path.basename(etapa['jsonl'])}")
+        else:
+            chunks = []
+            jsonl_path = self._caminho_chunks_jsonl()
+            with ChunkJsonlWriter(jsonl_path, self.loader.metadata_documento(self.pdf_path)) as writer:
+                for _, chunks_pagina in self.loader.iter_paginas(self.pdf_path, CONFIG_ESG):
+                    writer.write(chunks_pagina)
+                    chunks.extend(chunks_pagina)
+            # Páginas contadas aqui, na etapa de extração: quem registra no manifesto
+            # roda em threads, e o pdfium não pode ser chamado de várias threads
+            self.diario.concluir_etapa("chunks", {
+                "jsonl": jsonl_path, "total": len(chunks), "paginas": self.loader.contar_paginas(self.pdf_path),
+            })
+            if chunks:
+                print(f"📂 JSONL de auditoria criado com {len(chunks)} chunks: {os.path.basename(jsonl_path)}")
+
+        if not chunks:
+            print(f"⚠️ {self.filename}: Nenhum conteúdo relevante.")
+            return []
+
+        # --- ETAPA 3: Deduplicação (o JSONL de auditoria mantém os chunks brutos) ---
+        return self.deduplicator.deduplicar(chunks)
+
+    def processar_chunks(self, chunks):
+        """Etapas 4 e 5 (rede): chunks -> LLM -> CSV final. Retorna o número de linhas."""
+        # --- ETAPA 4: Processamento LLM (Chunks -> Dados Estruturados) ---
         print(f"⌛ Etapa 4: Analisando chunks via LLM...")
-        # Enviamos os chunks vindos do ARQUIVO JSON, não da memória direta
-        resultado_llm = self.processor._extrair_texto_estruturado_csv(dados_para_processar["chunks"])
+        resultado_llm = self.processor._extrair_texto_estruturado_csv(chunks, doc_id=self.pdf_hash, diario=self.diario)
         
         # --- ETAPA 5: Exportação Final ---
-        self._export_final_csv(resultado_llm, dados_para_processar["metadata"])
-        return True
+        csv_path = self._export_final_csv(resultado_llm, self.loader.metadata_documento(self.pdf_path))
+        self.diario.concluir_etapa("concluido", {"csv": csv_path, "linhas": len(resultado_llm)})
+        return len(resultado_llm)
+
+    def artefatos(self):
+        """Caminhos gerados para este PDF, para o manifesto."""
+        concluido = self.diario.etapa("concluido") or {}
+        chunks = self.diario.etapa("chunks") or {}
+        return {"csv": concluido.get("csv"), "chunks_jsonl": chunks.get("jsonl"), "diario": self.diario.caminho}
+
+    def registrar_no_manifesto(self, manifesto):
+        paginas = (self.diario.etapa("chunks") or {}).get("paginas")
+        if paginas is None:
+            # Diários anteriores à contagem na extração
+            paginas = self.loader.contar_paginas(self.pdf_path)
+        manifesto.registrar(self.pdf_hash, self.filename, paginas, PIPELINE_VERSAO, self.artefatos())
 
-    def _save_json_chunks(self, raw_data):
+    def _caminho_chunks_jsonl(self):
         nome_base = os.path.splitext(self.filename)[0].replace(" ", "_")
         timestamp = datetime.now().strftime("%Y%m%d")
-        json_filename = f"chunks_empresa_{nome_base}_{timestamp}.json"
-        path = os.path.join(self.output_dir, json_filename)
-        
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(raw_data, f, indent=4, ensure_ascii=False)
-        print(f"📂 JSON de auditoria criado com sucesso.")
-        return path # Retornamos o caminho para o run_pipeline poder ler
+        return os.path.join(self.output_dir, f"chunks_empresa_{nome_base}_{timestamp}.jsonl")
 
     def _export_final_csv(self, dados_llm, metadata):
         # 1. Determinar o nome da empresa
@@ -136,7 +361,7 @@ class ESGAutomationOrchestrator:
         df = pd.DataFrame(dados_llm)
         
         # 4. Reorganizar colunas para as mais importantes virem primeiro (opcional)
-        cols_priority = ["empresa", "ano_relatorio", "Dado Extraído", "Valor", "Fonte (Texto Original)", "Página"]
+        cols_priority = ["empresa", "ano_relatorio", "Dado Extraído", "Valor", "Unidade", "Fonte (Texto Original)", "Página", "Origem"]
         # Mantém as colunas existentes que batem com a prioridade
         cols = [c for c in cols_priority if c in df.columns] + [c for c in df.columns if c not in cols_priority]
         df = df[cols]
@@ -148,8 +373,20 @@ class ESGAutomationOrchestrator:
 
         df.to_csv(csv_path, index=False, sep=";", encoding="utf-8-sig")
         print(f"✅ Tabela de auditoria salva: {csv_filename}")
+        return csv_path
+
+def _consultar_manifesto(manifesto, arquivo, pdf_hash):
+    """Entrada do manifesto se este conteúdo já foi processado pela versão atual."""
+    entrada = manifesto.consultar(pdf_hash, PIPELINE_VERSAO)
+    if entrada is not None:
+        processado_em = datetime.fromtimestamp(entrada["processado_em"]).strftime("%Y-%m-%d %H:%M")
+        print(f"⏭️ {arquivo}: mesmo conteúdo de {entrada['arquivo']}, já processado em {processado_em} "
+              f"({entrada['artefatos'].get('csv')}); use --force para reprocessar")
+    return entrada
+
 
-def main():
+def main(forcar_atualizacao=False, expandir_catalogo=False, backend=LLM_BACKEND,
+         caminho_cassete=CAMINHO_CASSETE, latencia_simulada=LATENCIA_SIMULADA, retomar=False, forcar=False):
     # 1. Listar todos os PDFs na pasta RAW
     arquivos = [f for f in os.listdir(DIR_RAW) if f.lower().endswith(".pdf")]
     
@@ -158,22 +395,554 @@ def main():
         return
 
     print(f"📂 Encontrados {len(arquivos)} arquivos para processar.")
+    # Criados uma vez e reaproveitados por todos os arquivos (conexões HTTP com keep-alive)
+    loader = criar_loader()
+    registro_clientes = criar_registro_clientes()
+    manifesto = ProcessingManifest(CAMINHO_MANIFESTO)
 
     for arquivo in arquivos:
         caminho_completo = os.path.join(DIR_RAW, arquivo)
         
         try:
-            orchestrator = ESGAutomationOrchestrator(caminho_completo)
+            # Conteúdo já processado (mesmo com outro nome de arquivo) não é refeito
+            pdf_hash = hash_arquivo(caminho_completo)
+            if not forcar and _consultar_manifesto(manifesto, arquivo, pdf_hash):
+                _mover_para_processados(caminho_completo)
+                continue
+
+            orchestrator = ESGAutomationOrchestrator(
+                caminho_completo, forcar_atualizacao=forcar_atualizacao, expandir_catalogo=expandir_catalogo,
+                backend=backend, caminho_cassete=caminho_cassete, latencia_simulada=latencia_simulada,
+                loader=loader, registro_clientes=registro_clientes, retomar=retomar, pdf_hash=pdf_hash,
+            )
             sucesso = orchestrator.run_pipeline()
             
             if sucesso:
+                orchestrator.registrar_no_manifesto(manifesto)
                 # 2. Mover arquivo para PROCESSED após o sucesso
-                destino = os.path.join(DIR_PROCESSED, arquivo)
-                shutil.move(caminho_completo, destino)
-                print(f"📦 Arquivo movido para: {DIR_PROCESSED}")
+                _mover_para_processados(caminho_completo)
                 
         except Exception as e:
             print(f"💥 Erro ao processar {arquivo}: {str(e)}")
+    registro_clientes.fechar()
+    manifesto.close()
+
+def _mover_para_processados(caminho_completo):
+    destino = os.path.join(DIR_PROCESSED, os.path.basename(caminho_completo))
+    shutil.move(caminho_completo, destino)
+    print(f"📦 Arquivo movido para: {DIR_PROCESSED}")
+
+
+_LOADER_DO_PROCESSO = None
+
+
+def _extrair_para_lote(caminho_completo, retomar=False, pdf_hash=None):
+    """Etapas 1 a 3 de um PDF, executadas num processo do pool de extração.
+
+    Retorna (chunks, segundos, já concluído num run anterior).
+    """
+    global _LOADER_DO_PROCESSO
+    inicio = time.perf_counter()
+    # O pool já paraleliza entre arquivos: cada processo lê as páginas em sequência,
+    # com um loader só para todos os arquivos que passarem por ele
+    if _LOADER_DO_PROCESSO is None:
+        _LOADER_DO_PROCESSO = criar_loader(n_workers=1)
+    orchestrator = ESGAutomationOrchestrator(
+        caminho_completo, loader=_LOADER_DO_PROCESSO, retomar=retomar, pdf_hash=pdf_hash
+    )
+    if orchestrator.diario.concluida("concluido"):
+        return [], time.perf_counter() - inicio, True
+    chunks = orchestrator.extrair_chunks()
+    return chunks, time.perf_counter() - inicio, False
+
+
+def main_paralelo(forcar_atualizacao=False, expandir_catalogo=False, backend=LLM_BACKEND,
+                  caminho_cassete=CAMINHO_CASSETE, latencia_simulada=LATENCIA_SIMULADA,
+                  workers_extracao=LOTE_WORKERS_EXTRACAO, workers_llm=LOTE_WORKERS_LLM, retomar=False,
+                  forcar=False):
+    """Processa a pasta RAW em lote, com as duas metades do pipeline sobrepostas.
+
+    A extração do PDF (CPU) roda num pool de processos; assim que um arquivo
+    termina, a etapa LLM dele entra num pool limitado de threads, que divide
+    um único RateLimiter e um único catálogo. Um arquivo só vai para
+    PROCESSED quando as duas etapas terminam sem erro. Conteúdos que já
+    estão no manifesto (ou repetidos dentro do lote) não entram nos pools.
+    Ao final, um resumo por arquivo é impresso e salvo em
+    DIR_OUTPUT/lote_<timestamp>.json.
+    """
+    arquivos = sorted(f for f in os.listdir(DIR_RAW) if f.lower().endswith(".pdf"))
+    if not arquivos:
+        print("📭 Ninguém para processar na pasta /data/raw")
+        return []
+
+    print(f"📂 Encontrados {len(arquivos)} arquivos para processar "
+          f"({workers_extracao} processos de extração, {workers_llm} threads de LLM).")
+    limitador = RateLimiter(LLM_RPM, LLM_TPM)
+    catalogo = MetricCatalog(CAMINHO_CATALOGO, CAMINHO_CATALOGO_EXPANSOES)
+    registro_clientes = criar_registro_clientes()
+    loader = criar_loader()
+    manifesto = ProcessingManifest(CAMINHO_MANIFESTO)
+    resultados = {a: {"arquivo": a, "status": "pendente", "chunks": 0, "linhas": 0,
+                      "tempo_extracao_s": None, "tempo_llm_s": None, "erro": None} for a in arquivos}
+
+    def orchestrator_llm(arquivo):
+        return ESGAutomationOrchestrator(
+            os.path.join(DIR_RAW, arquivo), forcar_atualizacao=forcar_atualizacao, expandir_catalogo=expandir_catalogo,
+            backend=backend, caminho_cassete=caminho_cassete, latencia_simulada=latencia_simulada,
+            catalogo=catalogo, limitador=limitador, loader=loader, registro_clientes=registro_clientes,
+            # O processo de extração já decidiu se o diário seria descartado; aqui ele só continua
+            retomar=True, pdf_hash=hashes[arquivo],
+        )
+
+    def etapa_llm(arquivo, chunks):
+        inicio = time.perf_counter()
+        orchestrator = orchestrator_llm(arquivo)
+        linhas = orchestrator.processar_chunks(chunks)
+        orchestrator.registrar_no_manifesto(manifesto)
+        return linhas, time.perf_counter() - inicio
+
+    # Filtro pelo manifesto antes de ocupar os pools (O(1) por arquivo, fora o hash)
+    hashes, pendentes, primeiro_por_hash = {}, [], {}
+    for arquivo in arquivos:
+        resultado = resultados[arquivo]
+        try:
+            hashes[arquivo] = hash_arquivo(os.path.join(DIR_RAW, arquivo))
+        except Exception as e:
+            resultado.update(status="erro_extracao", erro=str(e))
+            continue
+        duplicado_no_lote = primeiro_por_hash.get(hashes[arquivo])
+        if duplicado_no_lote:
+            # Fica em RAW: depois que o original for concluído, o manifesto o pula
+            resultado.update(status="duplicado", erro=f"mesmo conteúdo de {duplicado_no_lote}")
+        elif not forcar and _consultar_manifesto(manifesto, arquivo, hashes[arquivo]):
+            _mover_para_processados(os.path.join(DIR_RAW, arquivo))
+            resultado["status"] = "duplicado"
+        else:
+            pendentes.append(arquivo)
+            primeiro_por_hash[hashes[arquivo]] = arquivo
+
+    inicio_lote = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers_extracao) as pool_extracao, \
+            ThreadPoolExecutor(max_workers=workers_llm) as pool_llm:
+        extracoes = {
+            pool_extracao.submit(_extrair_para_lote, os.path.join(DIR_RAW, a), retomar, hashes[a]): a
+            for a in pendentes
+        }
+        etapas_llm = {}
+        for futuro in as_completed(extracoes):
+            arquivo = extracoes[futuro]
+            resultado = resultados[arquivo]
+            try:
+                chunks, resultado["tempo_extracao_s"], ja_concluido = futuro.result()
+            except Exception as e:
+                resultado.update(status="erro_extracao", erro=str(e))
+                print(f"💥 Erro ao extrair {arquivo}: {str(e)}")
+                continue
+            if ja_concluido:
+                print(f"📓 {arquivo} já foi concluído num run anterior")
+                orchestrator_llm(arquivo).registrar_no_manifesto(manifesto)
+                _mover_para_processados(os.path.join(DIR_RAW, arquivo))
+                resultado["status"] = "ok"
+                continue
+            resultado["chunks"] = len(chunks)
+            if not chunks:
+                resultado["status"] = "sem_conteudo"
+                continue
+            print(f"🧵 {arquivo}: {len(chunks)} chunks na fila do LLM")
+            etapas_llm[pool_llm.submit(etapa_llm, arquivo, chunks)] = arquivo
+
+        for futuro in as_completed(etapas_llm):
+            arquivo = etapas_llm[futuro]
+            resultado = resultados[arquivo]
+            try:
+                resultado["linhas"], resultado["tempo_llm_s"] = futuro.result()
+                _mover_para_processados(os.path.join(DIR_RAW, arquivo))
+                resultado["status"] = "ok"
+            except Exception as e:
+                resultado.update(status="erro_llm", erro=str(e))
+                print(f"💥 Erro ao processar {arquivo}: {str(e)}")
+    registro_clientes.fechar()
+    manifesto.close()
+    tempo_total = time.perf_counter() - inicio_lote
+
+    relatorio = list(resultados.values())
+    print(f"\n{'-'*50}\n📊 Resumo do lote ({tempo_total:.1f}s)")
+    for r in relatorio:
+        tempos = " + ".join(f"{t:.1f}s" for t in (r["tempo_extracao_s"], r["tempo_llm_s"]) if t is not None)
+        print(f"   {r['status']:<14} {r['arquivo']} | {r['chunks']} chunks, {r['linhas']} linhas"
+              f"{' | ' + tempos if tempos else ''}{' | ' + r['erro'] if r['erro'] else ''}")
+    sucessos = sum(r["status"] == "ok" for r in relatorio)
+    print(f"   {sucessos}/{len(relatorio)} arquivos concluídos")
+
+    caminho_relatorio = os.path.join(DIR_OUTPUT, f"lote_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(caminho_relatorio, "w", encoding="utf-8") as f:
+        json.dump({"tempo_total_s": tempo_total, "arquivos": relatorio}, f, ensure_ascii=False, indent=2)
+    print(f"🗒️ Relatório do lote salvo: {caminho_relatorio}")
+    return relatorio
+
+
+def _travar_daemon():
+    """Trava exclusiva do daemon (um por pasta); None se outro já estiver rodando."""
+    try:
+        import fcntl
+    except ImportError:  # Windows: sem trava entre processos
+        return open(CAMINHO_TRAVA_DAEMON, "w")
+    trava = open(CAMINHO_TRAVA_DAEMON, "w")
+    try:
+        fcntl.flock(trava, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        trava.close()
+        return None
+    trava.write(str(os.getpid()))
+    trava.flush()
+    return trava
+
+
+def criar_fila():
+    return WorkQueue(CAMINHO_FILA, DAEMON_MAX_TENTATIVAS, DAEMON_ESPERA_BASE_S, DAEMON_ESPERA_MAX_S)
+
+
+def _ignorar_sigint():
+    # Ctrl+C chega a todo o grupo de processos; quem decide o encerramento é o daemon
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _escrever_status(status):
+    # Grava num temporário e troca, para quem lê nunca ver o arquivo pela metade
+    temporario = CAMINHO_STATUS_DAEMON + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(status, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, CAMINHO_STATUS_DAEMON)
+
+
+def main_daemon(forcar_atualizacao=False, expandir_catalogo=False, backend=LLM_BACKEND,
+                caminho_cassete=CAMINHO_CASSETE, latencia_simulada=LATENCIA_SIMULADA, workers=DAEMON_WORKERS):
+    """Processo contínuo: observa RAW, enfileira PDFs novos e os processa.
+
+    A fila (SQLite) sobrevive a reinícios: itens interrompidos voltam a
+    pendente e continuam do diário de cada PDF. Conteúdos repetidos não
+    entram duas vezes na fila e os já concluídos são pulados pelo
+    manifesto. SIGINT/SIGTERM encerram sem pegar itens novos, esperando os
+    que estão em andamento. O estado fica em CAMINHO_STATUS_DAEMON,
+    atualizado a cada DAEMON_INTERVALO_S (ver `daemon status`).
+
+    Cada worker é uma thread que reserva itens da fila e faz a etapa LLM;
+    a extração do PDF (CPU, presa ao GIL em threads) vai para um pool de
+    `workers` processos, como no modo --paralelo.
+    """
+    trava = _travar_daemon()
+    if trava is None:
+        print(f"🔒 Já existe um daemon rodando ({CAMINHO_TRAVA_DAEMON})")
+        return
+
+    fila = criar_fila()
+    orfaos = fila.recuperar_orfaos()
+    if orfaos:
+        print(f"♻️ {orfaos} itens interrompidos voltaram para a fila")
+    manifesto = ProcessingManifest(CAMINHO_MANIFESTO)
+    limitador = RateLimiter(LLM_RPM, LLM_TPM)
+    catalogo = MetricCatalog(CAMINHO_CATALOGO, CAMINHO_CATALOGO_EXPANSOES)
+    registro_clientes = criar_registro_clientes()
+
+    parar = threading.Event()
+    novo_item = threading.Condition()
+    lock_estado = threading.Lock()
+    estado = {"em_andamento": {}, "processados": 0, "erros": 0}
+    iniciado_em = datetime.now().isoformat(timespec="seconds")
+
+    # Hash por (caminho, tamanho, data): arquivos reoferecidos pelo watcher não são relidos
+    hashes = {}
+
+    def ao_encontrar(caminho):
+        """False se o arquivo deve ser reoferecido depois (cópia de um conteúdo ainda na fila)."""
+        try:
+            estado_arquivo = os.stat(caminho)
+            chave = (caminho, estado_arquivo.st_size, estado_arquivo.st_mtime_ns)
+            if chave not in hashes:
+                hashes[chave] = hash_arquivo(caminho)
+            pdf_hash = hashes[chave]
+        except OSError as e:
+            print(f"⚠️ Não foi possível ler {caminho}: {e}")
+            return True
+        if fila.enfileirar(caminho, pdf_hash):
+            print(f"📥 Na fila: {os.path.basename(caminho)}")
+            with novo_item:
+                novo_item.notify()
+            return True
+        # O mesmo conteúdo já está na fila com outro nome: quando ele terminar,
+        # esta cópia entra como concluída e o manifesto só a move para PROCESSED
+        item = fila.item(pdf_hash)
+        return item is not None and item[0] == caminho
+
+    def processar(pdf_hash, caminho, loader):
+        arquivo = os.path.basename(caminho)
+        if not os.path.exists(caminho):
+            fila.falhar(pdf_hash, "arquivo removido de RAW antes do processamento", definitivo=True)
+            return
+        if _consultar_manifesto(manifesto, arquivo, pdf_hash):
+            _mover_para_processados(caminho)
+            fila.concluir(pdf_hash)
+            return
+
+        print(f"\n{'-'*50}\n🚀 Processando arquivo: {arquivo}")
+        # Extração (CPU) num processo do pool; esta thread só espera e segue com o LLM.
+        # Uma nova tentativa (ou um reinício do daemon) continua do diário
+        chunks, _, ja_concluido = pool_extracao.submit(_extrair_para_lote, caminho, True, pdf_hash).result()
+        orchestrator = ESGAutomationOrchestrator(
+            caminho, forcar_atualizacao=forcar_atualizacao, expandir_catalogo=expandir_catalogo,
+            backend=backend, caminho_cassete=caminho_cassete, latencia_simulada=latencia_simulada,
+            catalogo=catalogo, limitador=limitador, loader=loader, registro_clientes=registro_clientes,
+            retomar=True, pdf_hash=pdf_hash,
+        )
+        if ja_concluido:
+            print(f"📓 {arquivo} já foi concluído: {orchestrator.diario.etapa('concluido')['csv']}")
+        elif not chunks:
+            fila.falhar(pdf_hash, "nenhum conteúdo relevante", definitivo=True)
+            return
+        else:
+            orchestrator.processar_chunks(chunks)
+        orchestrator.registrar_no_manifesto(manifesto)
+        _mover_para_processados(caminho)
+        fila.concluir(pdf_hash)
+
+    def worker():
+        loader = criar_loader()
+        while not parar.is_set():
+            item = fila.reservar()
+            if item is None:
+                with novo_item:
+                    novo_item.wait(DAEMON_INTERVALO_S)
+                continue
+            pdf_hash, caminho = item
+            nome = threading.current_thread().name
+            with lock_estado:
+                estado["em_andamento"][nome] = os.path.basename(caminho)
+            try:
+                processar(pdf_hash, caminho, loader)
+                with lock_estado:
+                    estado["processados"] += 1
+            except Exception as e:
+                print(f"💥 Erro ao processar {os.path.basename(caminho)}: {str(e)}")
+                fila.falhar(pdf_hash, e)
+                with lock_estado:
+                    estado["erros"] += 1
+            finally:
+                with lock_estado:
+                    estado["em_andamento"].pop(nome, None)
+
+    def status(situacao):
+        with lock_estado:
+            em_andamento = sorted(estado["em_andamento"].values())
+            processados, erros = estado["processados"], estado["erros"]
+        return {
+            "pid": os.getpid(),
+            "situacao": situacao,
+            "iniciado_em": iniciado_em,
+            "atualizado_em": datetime.now().isoformat(timespec="seconds"),
+            "intervalo_s": DAEMON_INTERVALO_S,
+            "observador": watcher.modo,
+            "workers": workers,
+            "fila": fila.contagens(),
+            "em_andamento": em_andamento,
+            "processados_nesta_execucao": processados,
+            "erros_nesta_execucao": erros,
+            "ultimos_erros": fila.erros(5),
+        }
+
+    def encerrar(sinal, _frame):
+        if not parar.is_set():
+            print(f"\n🛑 Sinal {signal.Signals(sinal).name}: encerrando após os arquivos em andamento...")
+            parar.set()
+
+    signal.signal(signal.SIGINT, encerrar)
+    signal.signal(signal.SIGTERM, encerrar)
+
+    pool_extracao = ProcessPoolExecutor(max_workers=workers, initializer=_ignorar_sigint)
+    watcher = FolderWatcher(DIR_RAW, ao_encontrar, DAEMON_INTERVALO_S, DAEMON_ESTABILIDADE_S)
+    watcher.iniciar()
+    threads = [threading.Thread(target=worker, name=f"worker-{i + 1}") for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    print(f"👀 Daemon observando {DIR_RAW} ({watcher.modo}, {workers} workers); status em {CAMINHO_STATUS_DAEMON}")
+
+    while not parar.is_set():
+        _escrever_status(status("rodando"))
+        parar.wait(DAEMON_INTERVALO_S)
+
+    _escrever_status(status("encerrando"))
+    watcher.parar()
+    with novo_item:
+        novo_item.notify_all()
+    for thread in threads:
+        thread.join()
+    pool_extracao.shutdown()
+    _escrever_status(status("parado"))
+    registro_clientes.fechar()
+    manifesto.close()
+    fila.close()
+    trava.close()
+    print("👋 Daemon encerrado")
+
+
+def comando_daemon_status():
+    """Imprime o status do daemon; código de saída 1 se ele não estiver saudável."""
+    if not os.path.exists(CAMINHO_STATUS_DAEMON):
+        print(f"❔ Nenhum status em {CAMINHO_STATUS_DAEMON}: o daemon nunca rodou aqui")
+        return 1
+    with open(CAMINHO_STATUS_DAEMON, "r", encoding="utf-8") as f:
+        status = json.load(f)
+    atraso = (datetime.now() - datetime.fromisoformat(status["atualizado_em"])).total_seconds()
+    # Sem atualização por 3 intervalos, o processo travou ou morreu sem encerrar
+    saudavel = status["situacao"] == "rodando" and atraso <= 3 * status["intervalo_s"]
+    print(f"{'💚' if saudavel else '💔'} Daemon {status['situacao']} (pid {status['pid']}, "
+          f"atualizado há {atraso:.0f}s, observador {status['observador']}, {status['workers']} workers)")
+    print(f"   Fila: {status['fila']}")
+    print(f"   Em andamento: {', '.join(status['em_andamento']) or '-'}")
+    print(f"   Nesta execução: {status['processados_nesta_execucao']} processados, "
+          f"{status['erros_nesta_execucao']} erros")
+    for erro in status["ultimos_erros"]:
+        print(f"   ❌ {os.path.basename(erro['caminho'])} ({erro['tentativas']} tentativas): {erro['erro']}")
+    return 0 if saudavel else 1
+
+
+def comando_daemon_retry():
+    """Devolve à fila os itens com erro definitivo; um daemon rodando os pega na próxima reserva."""
+    fila = criar_fila()
+    reenfileirados = fila.reenfileirar_erros()
+    fila.close()
+    print(f"♻️ {reenfileirados} itens com erro voltaram para a fila")
+
+
+def comando_cache(acao):
+    cache = ExtractionCache(CAMINHO_CACHE_EXTRACAO, CACHE_EXTRACAO_MB)
+    cache_embeddings = SQLiteLRUStore(CAMINHO_CACHE_EMBEDDINGS, CACHE_EMBEDDINGS_MB * 1024 * 1024)
+    cache_llm = SQLiteLRUStore(CAMINHO_CACHE_LLM, CACHE_LLM_MB * 1024 * 1024)
+    if acao == "purge":
+        cache.purge()
+        cache_embeddings.purge()
+        cache_llm.purge()
+        shutil.rmtree(DIR_COLECOES, ignore_errors=True)
+        shutil.rmtree(DIR_INDICES_NUMPY, ignore_errors=True)
+        shutil.rmtree(DIR_DIARIOS, ignore_errors=True)
+        print(f"🧹 Caches limpos: {CAMINHO_CACHE_EXTRACAO}, {CAMINHO_CACHE_EMBEDDINGS}, {CAMINHO_CACHE_LLM}, "
+              f"{DIR_COLECOES}, {DIR_INDICES_NUMPY}, {DIR_DIARIOS}")
+        return
+
+    info = cache.info()
+    print(f"💾 Cache de extração: {info['caminho']}")
+    print(f"   Limite: {info['limite_bytes'] / 1024 / 1024:.0f} MB")
+    for tipo in ("layout", "chunks"):
+        print(f"   {tipo}: {info[tipo]['entradas']} páginas, {info[tipo]['tamanho_bytes'] / 1024 / 1024:.2f} MB")
+
+    info = cache_embeddings.info()
+    print(f"💾 Cache de embeddings: {CAMINHO_CACHE_EMBEDDINGS}")
+    print(f"   Limite: {CACHE_EMBEDDINGS_MB} MB")
+    print(f"   vetores: {info['entradas']}, {info['tamanho_bytes'] / 1024 / 1024:.2f} MB")
+
+    info = cache_llm.info()
+    print(f"💾 Cache do LLM: {CAMINHO_CACHE_LLM}")
+    print(f"   Limite: {CACHE_LLM_MB} MB, validade de {CACHE_LLM_TTL_HORAS} h")
+    print(f"   respostas: {info['entradas']}, {info['tamanho_bytes'] / 1024 / 1024:.2f} MB")
+
+    colecoes = os.listdir(DIR_COLECOES) if os.path.isdir(DIR_COLECOES) else []
+    print(f"💾 Coleções Chroma persistentes: {DIR_COLECOES} ({len(colecoes)} itens)")
+    indices = os.listdir(DIR_INDICES_NUMPY) if os.path.isdir(DIR_INDICES_NUMPY) else []
+    print(f"💾 Índices NumPy persistentes: {DIR_INDICES_NUMPY} ({len(indices)} itens)")
+    diarios = os.listdir(DIR_DIARIOS) if os.path.isdir(DIR_DIARIOS) else []
+    print(f"📓 Diários de execução: {DIR_DIARIOS} ({len(diarios)} PDFs)")
+    info = ProcessingManifest(CAMINHO_MANIFESTO).info()
+    print(f"🗂️ Manifesto de processados: {info['caminho']} (não é apagado pelo purge)")
+    print(f"   {info['pdfs']} PDFs, {info['paginas']} páginas; versões do pipeline: {info['versoes'] or '-'}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Pipeline de extração de métricas ESG")
+    parser.add_argument(
+        "--forcar-atualizacao", action="store_true",
+        help="Ignora o cache de respostas do LLM e refaz todas as chamadas",
+    )
+    parser.add_argument(
+        "--expandir-catalogo", action="store_true",
+        help=f"Roda a descoberta de métricas pelo LLM e grava as novas em {CAMINHO_CATALOGO_EXPANSOES}",
+    )
+    parser.add_argument(
+        "--backend", choices=["openai", "gravar", "reproduzir", "falso"], default=LLM_BACKEND,
+        help="openai (padrão), gravar/reproduzir um cassete de respostas, ou falso (offline)",
+    )
+    parser.add_argument("--cassete", default=CAMINHO_CASSETE, help="Arquivo de cassete dos modos gravar/reproduzir")
+    parser.add_argument(
+        "--latencia-simulada", type=float, default=LATENCIA_SIMULADA,
+        help="Segundos de espera por chamada nos modos reproduzir/falso",
+    )
+    parser.add_argument(
+        "--paralelo", action="store_true",
+        help="Processa os PDFs em lote: extração em processos e etapa LLM em threads, sobrepostas",
+    )
+    parser.add_argument("--workers-extracao", type=int, default=LOTE_WORKERS_EXTRACAO,
+                        help="Processos de extração de PDF no modo --paralelo")
+    parser.add_argument("--workers-llm", type=int, default=LOTE_WORKERS_LLM,
+                        help="Arquivos na etapa LLM ao mesmo tempo no modo --paralelo")
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Reprocessa PDFs cujo conteúdo já consta no manifesto de processados",
+    )
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Continua cada PDF do último checkpoint do seu diário, sem refazer etapas e métricas concluídas",
+    )
+    subparsers = parser.add_subparsers(dest="comando")
+    parser_cache = subparsers.add_parser("cache", help="Inspeciona ou limpa os caches de extração, embeddings, LLM e coleções")
+    parser_cache.add_argument("acao", choices=["info", "purge"])
+    parser_daemon = subparsers.add_parser(
+        "daemon", help="Observa data/raw continuamente e processa os PDFs novos por uma fila persistente",
+    )
+    parser_daemon.add_argument(
+        "acao", nargs="?", choices=["iniciar", "status", "retry"], default="iniciar",
+        help="iniciar (padrão), status, ou retry para devolver à fila os itens com erro",
+    )
+    parser_daemon.add_argument(
+        "--workers-daemon", type=int, default=DAEMON_WORKERS,
+        help="PDFs processados ao mesmo tempo pelo daemon (extração em processos, LLM em threads)",
+    )
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.comando == "cache":
+        comando_cache(args.acao)
+    elif args.comando == "daemon" and args.acao == "status":
+        raise SystemExit(comando_daemon_status())
+    elif args.comando == "daemon" and args.acao == "retry":
+        comando_daemon_retry()
+    elif args.comando == "daemon":
+        main_daemon(
+            forcar_atualizacao=args.forcar_atualizacao,
+            expandir_catalogo=args.expandir_catalogo,
+            backend=args.backend,
+            caminho_cassete=args.cassete,
+            latencia_simulada=args.latencia_simulada,
+            workers=args.workers_daemon,
+        )
+    elif args.paralelo:
+        main_paralelo(
+            forcar_atualizacao=args.forcar_atualizacao,
+            expandir_catalogo=args.expandir_catalogo,
+            backend=args.backend,
+            caminho_cassete=args.cassete,
+            latencia_simulada=args.latencia_simulada,
+            workers_extracao=args.workers_extracao,
+            workers_llm=args.workers_llm,
+            retomar=args.resume,
+            forcar=args.force,
+        )
+    else:
+        main(
+            forcar_atualizacao=args.forcar_atualizacao,
+            expandir_catalogo=args.expandir_catalogo,
+            backend=args.backend,
+            caminho_cassete=args.cassete,
+            latencia_simulada=args.latencia_simulada,
+            retomar=args.resume,
+            forcar=args.force,
+        )
\ No newline at end of file
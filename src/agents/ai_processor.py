@@ -1,21 +1,228 @@
 
-import re
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
-from langchain_community.vectorstores import Chroma
+import os
+import shutil
+import threading
+import numpy as np
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+from concurrent.futures import ThreadPoolExecutor
+
+from src.agents.backends import criar_backends
+from src.agents.context_builder import ContextBuilder
+from src.agents.embedding_cache import CachedEmbeddings
+from src.agents.llm_cache import LLMResponseCache
+from src.agents.regex_extractor import RegexMetricExtractor
+from src.agents.rate_limiter import RateLimiter, executar_com_retentativas
+from src.agents.vector_index import NumpyVectorIndex
+from src.utils.hashing import hash_objeto
+from src.utils.numeric_normalizer import normalizar_valor
 
 
 class ESGMetricProcessor:
-    def __init__(self, OPENAI_API_KEY):
-        self.model = ChatOpenAI(model_name="gpt-4o", temperature=0, api_key=OPENAI_API_KEY)
-        self.embeddings = OpenAIEmbeddings(api_key=OPENAI_API_KEY)
+    def __init__(self, OPENAI_API_KEY, caminho_cache_embeddings=None, cache_embeddings_mb=1024,
+                 dir_colecoes=None, max_concorrencia=1, requisicoes_por_minuto=None,
+                 tokens_por_minuto=None, max_tentativas=5, modo_extracao="individual",
+                 limiar_sobreposicao=0.6, max_metricas_por_grupo=6, caminho_cache_llm=None,
+                 cache_llm_mb=256, ttl_cache_llm_horas=24 * 30, forcar_atualizacao=False,
+                 backend_vetorial="chroma", orcamento_tokens_contexto=1500, catalogo=None,
+                 expandir_catalogo=False, extracao_hibrida=False, backend="openai",
+                 caminho_cassete=None, latencia_simulada=0.0, limitador=None, registro_clientes=None):
+        envolver_embeddings = None
+        if caminho_cache_embeddings:
+            # Chunks com texto idêntico ao de execuções anteriores não voltam à API
+            envolver_embeddings = lambda embeddings: CachedEmbeddings(
+                embeddings, caminho_cache_embeddings, cache_embeddings_mb
+            )
+        # "openai", "gravar"/"reproduzir" (cassete local) ou "falso" (offline); ver src/agents/backends.py
+        self.backend = backend
+        self.model, self.embeddings = criar_backends(
+            backend, OPENAI_API_KEY, caminho_cassete, latencia_simulada, envolver_embeddings=envolver_embeddings,
+            registro=registro_clientes,
+        )
         self.parser = JsonOutputParser()
+        # Contexto dos prompts de extração: sem trechos repetidos e limitado em tokens
+        self.construtor_contexto = ContextBuilder(orcamento_tokens_contexto, self.model.model_name)
+        self._lock_tokens = threading.Lock()
+        self.zerar_contagem_tokens()
+        # "chroma" ou "numpy" (índice exato em memória, sem o cliente do Chroma).
+        # Com dir_colecoes, cada documento ganha uma coleção/índice persistente
+        if backend_vetorial not in ("chroma", "numpy"):
+            raise ValueError(f"Backend vetorial desconhecido: {backend_vetorial}")
+        self.backend_vetorial = backend_vetorial
+        # Gravando ou reproduzindo um cassete, o índice é sempre montado de novo em
+        # memória: um índice persistido pularia os embeddings dos chunks, que então
+        # não entrariam no cassete (e faltariam ao reproduzir numa máquina limpa)
+        self.dir_colecoes = None if backend in ("gravar", "reproduzir") else dir_colecoes
+        self._cliente_chroma = None
+        # Extração das métricas em paralelo (1 = uma de cada vez), limitada por RPM/TPM
+        self.max_concorrencia = max_concorrencia
+        # Um limitador compartilhado (processamento em lote) vale para todos os documentos
+        self.limitador = limitador or RateLimiter(requisicoes_por_minuto, tokens_por_minuto)
+        self.max_tentativas = max_tentativas
+        # "agrupado" junta numa só chamada as métricas cujos contextos recuperados se sobrepõem
+        self.modo_extracao = modo_extracao
+        self.limiar_sobreposicao = limiar_sobreposicao
+        self.max_metricas_por_grupo = max_metricas_por_grupo
+        self.ultimo_relatorio_agrupamento = None
+        # Catálogo de métricas por indicador GRI (MetricCatalog). Com ele a descoberta
+        # só roda quando expandir_catalogo=True, para acrescentar métricas novas
+        self.catalogo = catalogo
+        self.expandir_catalogo = expandir_catalogo
+        # Híbrida: métricas do catálogo com valor inequívoco no loader dispensam o LLM
+        self.extracao_hibrida = extracao_hibrida
+        self.ultimo_relatorio_hibrido = None
+        # Diário (RunJournal) do documento em processamento: cada linha montada é gravada nele
+        self.diario = None
+        # Cache de respostas das cadeias de descoberta e extração
+        self.cache_llm = None
+        if caminho_cache_llm:
+            # Gravando um cassete, toda chamada precisa chegar ao modelo; reproduzindo,
+            # toda resposta precisa vir do cassete, para provar que ele está completo
+            self.cache_llm = LLMResponseCache(
+                caminho_cache_llm, cache_llm_mb, ttl_cache_llm_horas,
+                ignorar_leitura=forcar_atualizacao or backend in ("gravar", "reproduzir"),
+            )
+
+    def _estimar_tokens(self, texto):
+        return self.construtor_contexto.contar_tokens(texto)
+
+    def zerar_contagem_tokens(self):
+        self.tokens_prompt = 0
+        self.tokens_contexto_bruto = 0
+        self.tokens_contexto = 0
+
+    def _registrar_tokens(self, rotulo, tokens_prompt, tokens_bruto, tokens_contexto):
+        with self._lock_tokens:
+            self.tokens_prompt += tokens_prompt
+            self.tokens_contexto_bruto += tokens_bruto
+            self.tokens_contexto += tokens_contexto
+        print(f"🧮 {rotulo}: {tokens_prompt} tokens de prompt (contexto {tokens_bruto} → {tokens_contexto})")
+
+    def relatorio_tokens(self):
+        economia = 1 - self.tokens_contexto / self.tokens_contexto_bruto if self.tokens_contexto_bruto else 0
+        return (f"🧮 Tokens de prompt no documento: {self.tokens_prompt} "
+                f"(contexto {self.tokens_contexto_bruto} → {self.tokens_contexto}, {economia:.0%} a menos)")
+
+    def _montar_contexto(self, docs):
+        """(contexto, docs_usados, tokens_do_contexto_bruto, tokens_do_contexto)."""
+        bruto = self._estimar_tokens("\n".join(d.page_content for d in docs))
+        contexto, usados, tokens = self.construtor_contexto.montar(docs)
+        return contexto, usados, bruto, tokens
+
+    def _invocar_modelo(self, prompt_value):
+        """Ponto único de chamada ao LLM: respeita RPM/TPM e repete em caso de rate limit."""
+        self.limitador.aguardar(self._estimar_tokens(prompt_value.to_string()))
+        return executar_com_retentativas(lambda: self.model.invoke(prompt_value), self.max_tentativas)
+
+    def _invocar_llm(self, prompt_value):
+        """Modelo + parser JSON, passando antes pelo cache de respostas (se houver).
+
+        Só respostas que o parser aceitou são gravadas, então uma resposta
+        malformada não fica presa no cache.
+        """
+        if self.cache_llm is None:
+            return self.parser.invoke(self._invocar_modelo(prompt_value))
+
+        chave = self.cache_llm.chave(
+            getattr(self.model, "model_name", type(self.model).__name__),
+            getattr(self.model, "temperature", None),
+            prompt_value.to_string(),
+            type(self.parser).__name__,
+        )
+        resposta = self.cache_llm.get(chave)
+        if resposta is None:
+            resposta = self.parser.invoke(self._invocar_modelo(prompt_value))
+            self.cache_llm.set(chave, resposta)
+        return resposta
 
-    def create_vector_db(self, documents):
+    def _obter_cliente_chroma(self):
+        if self._cliente_chroma is None:
+            import chromadb
+            self._cliente_chroma = chromadb.PersistentClient(path=self.dir_colecoes)
+        return self._cliente_chroma
+
+    @staticmethod
+    def _nome_colecao(doc_id):
+        return f"esg_{doc_id[:32]}"
+
+    @staticmethod
+    def _impressao_digital(documents):
+        return hash_objeto([[d.page_content, d.metadata] for d in documents])
+
+    def invalidar_colecao(self, doc_id):
+        """Remove a coleção persistente do documento; a próxima execução reindexa."""
+        if not self.dir_colecoes:
+            return
+        nome = self._nome_colecao(doc_id)
+        if self.backend_vetorial == "numpy":
+            diretorio = os.path.join(self.dir_colecoes, nome)
+            if os.path.isdir(diretorio):
+                shutil.rmtree(diretorio)
+                print(f"🗑️ Índice {nome} invalidado")
+            return
+        cliente = self._obter_cliente_chroma()
+        if nome in [c if isinstance(c, str) else c.name for c in cliente.list_collections()]:
+            cliente.delete_collection(nome)
+            print(f"🗑️ Coleção {nome} invalidada")
+
+    def create_vector_db(self, documents, doc_id=None):
         # O ChromaDB agora conterá apenas páginas que passaram no filtro do Loader
-        return Chroma.from_documents(documents, self.embeddings)
+        if self.backend_vetorial == "numpy":
+            vector_db = self._abrir_indice_numpy(documents, doc_id)
+        elif not self.dir_colecoes:
+            from langchain_community.vectorstores import Chroma
+            vector_db = Chroma.from_documents(documents, self.embeddings)
+        else:
+            vector_db = self._abrir_colecao(documents, doc_id or self._impressao_digital(documents))
+        return vector_db
+
+    def _abrir_colecao(self, documents, doc_id):
+        """Reabre a coleção do documento se o conjunto de chunks não mudou;
+        caso contrário ela é apagada e reindexada."""
+        from langchain_community.vectorstores import Chroma
+        cliente = self._obter_cliente_chroma()
+        nome = self._nome_colecao(doc_id)
+        impressao = self._impressao_digital(documents)
+
+        vector_db = Chroma(collection_name=nome, embedding_function=self.embeddings, client=cliente)
+        metadata = vector_db._collection.metadata or {}
+        if metadata.get("impressao_digital") == impressao and vector_db._collection.count() == len(documents):
+            print(f"♻️ Coleção {nome} reaproveitada ({len(documents)} chunks)")
+            return vector_db
+
+        if vector_db._collection.count():
+            print(f"🔄 Chunks mudaram; reindexando a coleção {nome}")
+        cliente.delete_collection(nome)
+        vector_db = Chroma(
+            collection_name=nome,
+            embedding_function=self.embeddings,
+            client=cliente,
+            collection_metadata={"impressao_digital": impressao},
+        )
+        vector_db.add_documents(documents)
+        return vector_db
+
+    def _abrir_indice_numpy(self, documents, doc_id):
+        """Mesma política de `_abrir_colecao` para o índice NumPy: reaproveita o
+        índice salvo se os chunks não mudaram, senão reindexa."""
+        if not self.dir_colecoes:
+            return NumpyVectorIndex.from_documents(documents, self.embeddings)
+
+        impressao = self._impressao_digital(documents)
+        nome = self._nome_colecao(doc_id or impressao)
+        diretorio = os.path.join(self.dir_colecoes, nome)
+        indice = NumpyVectorIndex.carregar(diretorio, self.embeddings)
+        if indice is not None and indice.metadata.get("impressao_digital") == impressao and len(indice) == len(documents):
+            print(f"♻️ Índice {nome} reaproveitado ({len(documents)} chunks)")
+            return indice
+
+        if indice is not None:
+            print(f"🔄 Chunks mudaram; reindexando o índice {nome}")
+        return NumpyVectorIndex.from_documents(
+            documents, self.embeddings, diretorio=diretorio, metadata={"impressao_digital": impressao}
+        )
     
     def discover_relevant_context(self, query, retriever):
         prompt = PromptTemplate(
@@ -46,38 +253,20 @@ class ESGMetricProcessor:
         chain = prompt | self.model | self.parser
         return chain.invoke({"question": query, "context": context})
     
-    def formatar_para_numero(self,valor):
-        if valor is None: 
-            return 0
-        
+    def formatar_para_numero(self, valor):
+        """Valor numérico pela normalização pt-BR compartilhada com o loader;
+        percentuais ficam em pontos percentuais ("36%" -> 36.0). Sem número, 0."""
+        return self._normalizar(valor)[0]
+
+    @staticmethod
+    def _normalizar(valor):
         if isinstance(valor, dict):
-            valor = next(iter(valor.values()), "0")
-        
-        texto = str(valor).replace(",", ".").strip()
-        
-        try:
-            numeros = re.findall(r"[-+]?\d*\.\d+|\d+", texto)
-            if not numeros:
-                return 0
-            
-            num_final = float(numeros[0])
-            
-            if "%" in texto:
-                return num_final / 100 if num_final > 1 else num_final
-            
-            return num_final
-        except (ValueError, IndexError):
-            return 0
+            valor = next(iter(valor.values()), None)
+        numero, unidade = normalizar_valor(valor)
+        return (0 if numero is None else numero), unidade
     
-    def _extrair_texto_estruturado_csv(self, chunks):
-        documentos = [
-            Document(page_content=c['contexto'], metadata={"pg": c.get('pagina', 'N/A')}) 
-            for c in chunks
-        ]
-
-        retriever = self.create_vector_db(documentos).as_retriever(search_kwargs={"k": 5})
-
-        discovery_prompt = PromptTemplate(
+    def _prompt_descoberta(self):
+        return PromptTemplate(
 
             template="""Você é um auditor especialista em GRI 405-1. Adcione um nome curto para cada métrica quantitativa relevante deste contexto. Retire pelo menos 20 métricas.
 
@@ -97,8 +286,9 @@ class ESGMetricProcessor:
             partial_variables={"format_instructions": self.parser.get_format_instructions()}
         )
 
+    def _prompt_extracao(self):
         # --- PROMPT COM FOCO EM EVIDÊNCIA ---
-        extraction_prompt = PromptTemplate(
+        return PromptTemplate(
             template="""Extraia o valor numérico e o trecho comprobatório.
             Responda em formato JSON:
             {{
@@ -112,40 +302,393 @@ class ESGMetricProcessor:
             partial_variables={"format_instructions": self.parser.get_format_instructions()}
         )
 
-        discovery_chain = {"context": retriever} | discovery_prompt | self.model | self.parser
-        extraction_chain = extraction_prompt | self.model | self.parser
+    def _prompt_extracao_agrupada(self):
+        # --- PROMPT DE VÁRIAS MÉTRICAS QUE COMPARTILHAM O MESMO CONTEXTO ---
+        return PromptTemplate(
+            template="""Extraia o valor numérico e o trecho comprobatório de CADA métrica listada.
+            Responda em formato JSON, com uma chave para cada nome de métrica:
+            {{
+                "nome_da_metrica": {{
+                    "valor": "o número encontrado",
+                    "trecho_original": "a frase exata de onde tirou a informação"
+                }}
+            }}
+            Contexto: {context}
+            Métricas (nome: pergunta):
+            {questions}
+            {format_instructions}""",
+            input_variables=["context", "questions"],
+            partial_variables={"format_instructions": self.parser.get_format_instructions()}
+        )
+
+    def _criar_retriever(self, chunks, doc_id=None):
+        documentos = []
+        for c in chunks:
+            metadata = {"pg": c.get('pagina', 'N/A')}
+            # Offsets na página, usados pelo ContextBuilder para unir janelas sobrepostas
+            if "inicio" in c and "fim" in c:
+                metadata.update(inicio=c["inicio"], fim=c["fim"])
+            documentos.append(Document(page_content=c['contexto'], metadata=metadata))
+
+        return self.create_vector_db(documentos, doc_id).as_retriever(search_kwargs={"k": 5})
+
+    @staticmethod
+    def _vetores_da_colecao(vector_db):
+        """(matriz de embeddings, documentos, métrica de distância) da coleção Chroma."""
+        dados = vector_db._collection.get(include=["embeddings", "documents", "metadatas"])
+        documentos = [
+            Document(id=id_, page_content=texto, metadata=meta or {})
+            for id_, texto, meta in zip(dados["ids"], dados["documents"], dados["metadatas"])
+        ]
+        metrica = (vector_db._collection.metadata or {}).get("hnsw:space", "l2")
+        return np.asarray(dados["embeddings"], dtype=np.float32), documentos, metrica
+
+    def recuperar_em_lote(self, queries, retriever):
+        """Equivalente a `[retriever.invoke(q) for q in queries]` com uma única
+        chamada de embedding e um único produto de matrizes.
 
-        metricas_descobertas = discovery_chain.invoke(
+        As distâncias seguem a métrica da coleção (L2 por padrão no Chroma),
+        então os documentos e a ordem coincidem com a busca por pergunta.
+        """
+        queries = list(queries)
+        if not queries:
+            return []
+        vector_db = retriever.vectorstore
+        k = retriever.search_kwargs.get("k", 4)
+        if isinstance(vector_db, NumpyVectorIndex):
+            # O índice NumPy já faz o top-k de várias consultas de uma vez
+            resultados = vector_db.buscar_por_vetores(self.embeddings.embed_documents(queries), k)
+            return [[vector_db.documentos[j] for j, _ in linha] for linha in resultados]
+        if not hasattr(vector_db, "_collection"):
+            return [retriever.invoke(q) for q in queries]
+
+        matriz, documentos, metrica = self._vetores_da_colecao(vector_db)
+        if not documentos:
+            return [[] for _ in queries]
+        k = min(k, len(documentos))
+        perguntas = np.asarray(self.embeddings.embed_documents(queries), dtype=np.float32)
+
+        produto = perguntas @ matriz.T
+        if metrica == "ip":
+            distancias = -produto
+        elif metrica == "cosine":
+            normas = np.linalg.norm(perguntas, axis=1)[:, None] * np.linalg.norm(matriz, axis=1)[None, :]
+            distancias = 1 - produto / np.maximum(normas, 1e-12)
+        else:
+            # ||q - d||² = ||q||² - 2 q·d + ||d||²
+            distancias = (perguntas ** 2).sum(axis=1)[:, None] - 2 * produto + (matriz ** 2).sum(axis=1)[None, :]
+
+        # Top-k sem ordenar a linha inteira; só os k escolhidos são ordenados
+        candidatos = np.argpartition(distancias, k - 1, axis=1)[:, :k]
+        ordem = np.take_along_axis(distancias, candidatos, axis=1).argsort(axis=1, kind="stable")
+        melhores = np.take_along_axis(candidatos, ordem, axis=1)
+        return [[documentos[j] for j in linha] for linha in melhores]
+
+    # Indicador que o prompt de descoberta cobre
+    INDICADOR_DESCOBERTA = "GRI 405-1"
+
+    @staticmethod
+    def _indicadores_dos_chunks(chunks):
+        indicadores = set()
+        for c in chunks:
+            indicadores.update(c.get("indicadores", [c.get("indicador_id")]))
+        indicadores.discard(None)
+        return indicadores
+
+    def metricas_para_extracao(self, chunks, retriever):
+        """Métricas a extrair: as do catálogo para os indicadores presentes nos
+        chunks; a descoberta pelo LLM só roda sem catálogo, quando o catálogo
+        não cobre os indicadores (sem alterá-lo) ou ao expandi-lo."""
+        if self.catalogo is None:
+            return self.descobrir_metricas(retriever)
+
+        indicadores = self._indicadores_dos_chunks(chunks)
+        if not self.expandir_catalogo and not self.catalogo.metricas(indicadores):
+            print(f"📚 Catálogo sem métricas para {', '.join(sorted(indicadores)) or '-'}; usando a descoberta desta execução")
+            return self.descobrir_metricas(retriever)
+        if self.expandir_catalogo:
+            novas = self.catalogo.expandir(self.INDICADOR_DESCOBERTA, self.descobrir_metricas(retriever))
+            indicadores.add(self.INDICADOR_DESCOBERTA)
+            print(f"📚 Catálogo expandido com {len(novas)} métricas novas: {', '.join(novas) or '-'}")
+
+        metricas = self.catalogo.metricas(indicadores)
+        print(f"📚 {len(metricas)} métricas do catálogo ({', '.join(sorted(indicadores))})")
+        return metricas
+
+    def descobrir_metricas(self, retriever):
+        # O contexto vai como texto puro: a repr dos Documents inclui ids gerados a
+        # cada indexação, o que mudaria o prompt (e a chave do cache) a cada execução
+        contexto = retriever | RunnableLambda(lambda docs: "\n".join(d.page_content for d in docs))
+        discovery_chain = {"context": contexto} | self._prompt_descoberta() | RunnableLambda(self._invocar_llm)
+        return discovery_chain.invoke(
             "GRI 405-1: Diversidade de empregados, gênero, raça, idade e composição do conselho"
         )
 
-        # --- NOVA ESTRUTURA: Lista de Auditoria ---
-        tabela_auditoria = []
+    def _extrair_texto_estruturado_csv(self, chunks, doc_id=None, diario=None):
+        """Linhas do CSV de auditoria, uma por métrica extraída.
+
+        Com um `diario` (RunJournal), a lista de métricas e cada linha pronta
+        são gravadas à medida que terminam; o que o diário já tiver não é
+        recalculado nem chamado de novo no LLM.
+        """
+        if self.cache_llm is not None:
+            self.cache_llm.zerar_contadores()
+        self.zerar_contagem_tokens()
+
+        concluidas = diario.metricas_concluidas() if diario is not None else {}
+        metricas = diario.etapa("metricas") if diario is not None else None
+        retriever = None
+        if metricas is None:
+            retriever = self._criar_retriever(chunks, doc_id)
+            metricas = self.metricas_para_extracao(chunks, retriever)
+            if diario is not None:
+                diario.concluir_etapa("metricas", metricas)
+        pendentes = {chave: query for chave, query in metricas.items() if chave not in concluidas}
+        if concluidas:
+            print(f"📓 Retomando: {len(metricas) - len(pendentes)} de {len(metricas)} métricas já extraídas")
 
-        for coluna, query in metricas_descobertas.items():
+        novas = []
+        if pendentes:
+            retriever = retriever or self._criar_retriever(chunks, doc_id)
+            self.diario = diario
             try:
-                print(f"🔍 Extraindo: {coluna}")
+                if self.extracao_hibrida and self.catalogo is not None:
+                    novas = self.extrair_hibrido(pendentes, chunks, retriever)
+                else:
+                    novas = self.extrair_metricas(pendentes, retriever)
+            finally:
+                self.diario = None
+
+        linhas = {**concluidas, **{linha["Dado Extraído"]: linha for linha in novas}}
+        tabela_auditoria = [linhas[chave] for chave in metricas if chave in linhas]
+
+        print(self.relatorio_tokens())
+        if self.cache_llm is not None:
+            print(self.cache_llm.relatorio())
+        # Inclui os embeddings das perguntas de recuperar_em_lote, não só os da indexação
+        if isinstance(self.embeddings, CachedEmbeddings):
+            print(self.embeddings.relatorio())
+            self.embeddings.zerar_contadores()
+        return tabela_auditoria
+
+    def _executar(self, funcao, itens):
+        """Aplica `funcao` a cada item, em paralelo se configurado, preservando a ordem."""
+        if self.max_concorrencia > 1:
+            # executor.map devolve na ordem dos itens
+            with ThreadPoolExecutor(max_workers=self.max_concorrencia) as executor:
+                return list(executor.map(funcao, itens))
+        return [funcao(item) for item in itens]
+
+    def extrair_metricas(self, metricas_descobertas, retriever, modo=None):
+        """Extrai o valor de cada métrica descoberta.
+
+        modo "individual": um prompt por métrica.
+        modo "agrupado": métricas cujos contextos recuperados se sobrepõem são
+        perguntadas juntas em uma única chamada.
+        """
+        modo = modo or self.modo_extracao
+        extraction_chain = self._prompt_extracao() | RunnableLambda(self._invocar_llm)
+
+        # --- NOVA ESTRUTURA: Lista de Auditoria ---
+        metricas = list(metricas_descobertas.items())
+
+        # Todas as perguntas são recuperadas de uma vez, antes das chamadas ao LLM
+        docs_por_metrica = self.recuperar_em_lote([query for _, query in metricas], retriever)
+
+        if modo == "agrupado":
+            linhas = self._extrair_agrupado(metricas, retriever, extraction_chain, docs_por_metrica)
+        else:
+            linhas = self._executar(
+                lambda i: self._extrair_metrica(
+                    metricas[i][0], metricas[i][1], retriever, extraction_chain, docs_por_metrica[i]
+                ),
+                range(len(metricas)),
+            )
+
+        tabela_auditoria = [linha for linha in linhas if linha is not None]
+        return tabela_auditoria # Retorna uma lista de linhas para o DataFrame
+
+    def extrair_hibrido(self, metricas, chunks, retriever):
+        """Resolve por regex o que o loader já extraiu sem ambiguidade e manda
+        só o restante ao LLM. As linhas saem na ordem das métricas."""
+        resolvidas = RegexMetricExtractor(self.catalogo).extrair(chunks, chaves=metricas)
+        linhas = {}
+        for chave, (valor, chunk) in resolvidas.items():
+            doc = Document(page_content=chunk["contexto"], metadata={"pg": chunk.get("pagina", "N/A")})
+            # O loader só gera chunks de percentuais; o "%" mantém a mesma escala do caminho LLM
+            resultado = {"valor": f"{valor:g}%", "trecho_original": chunk["contexto"]}
+            linhas[chave] = self._montar_linha(chave, resultado, [doc], origem="regex")
+            print(f"⚡ Regex: {chave} = {valor:g}% (p. {doc.metadata['pg']})")
+
+        restantes = {chave: query for chave, query in metricas.items() if chave not in resolvidas}
+        for linha in self.extrair_metricas(restantes, retriever) if restantes else []:
+            linhas[linha["Dado Extraído"]] = linha
+
+        self.ultimo_relatorio_hibrido = {
+            "metricas": len(metricas),
+            "regex": len(resolvidas),
+            "llm": len(restantes),
+        }
+        print(f"⚡ Extração híbrida: {len(resolvidas)} de {len(metricas)} métricas resolvidas sem LLM; "
+              f"{len(restantes)} enviadas ao LLM")
+        return [linhas[chave] for chave in metricas if chave in linhas]
+
+    def _montar_linha(self, coluna, resultado, docs_relacionados, origem="llm"):
+        paginas = list(set([str(d.metadata.get("pg", "N/A")) for d in docs_relacionados]))
+
+        valor, unidade = self._normalizar(resultado.get("valor"))
+        # Criando a linha conforme sua solicitação
+        linha = {
+            "empresa": "Bradesco",
+            "ano": 2024,
+            "Dado Extraído": coluna,
+            "Valor": valor,
+            "Unidade": unidade,
+            "Fonte (Texto Original)": resultado.get("trecho_original"),
+            "Página": ", ".join(paginas),
+            # "regex" (valor do loader aceito direto) ou "llm"
+            "Origem": origem,
+        }
+        if self.diario is not None:
+            self.diario.registrar_metrica(coluna, linha)
+        return linha
+
+    def _extrair_metrica(self, coluna, query, retriever, extraction_chain, docs_relacionados=None):
+        """Extrai uma métrica; falhas ficam isoladas e retornam None."""
+        try:
+            print(f"🔍 Extraindo: {coluna}")
+            if docs_relacionados is None:
                 docs_relacionados = retriever.invoke(query)
-                
-                paginas = list(set([str(d.metadata.get("pg", "N/A")) for d in docs_relacionados]))
-                contexto_unido = "\n".join([d.page_content for d in docs_relacionados])
-                
-                resultado = extraction_chain.invoke({"context": contexto_unido, "question": query})
-                
-                # Criando a linha conforme sua solicitação
-                linha_metrica = {
-                    "empresa": "Bradesco",
-                    "ano": 2024,
-                    "Dado Extraído": coluna,
-                    "Valor": self.formatar_para_numero(resultado.get("valor")),
-                    "Fonte (Texto Original)": resultado.get("trecho_original"),
-                    "Página": ", ".join(paginas)
-                }
-                
-                tabela_auditoria.append(linha_metrica)
-                print(f"✅ Sucesso: {coluna}")
 
+            contexto_unido, docs_usados, bruto, tokens_contexto = self._montar_contexto(docs_relacionados)
+            self._registrar_tokens(
+                coluna,
+                self._estimar_tokens(self._prompt_extracao().format(context=contexto_unido, question=query)),
+                bruto,
+                tokens_contexto,
+            )
+
+            resultado = extraction_chain.invoke({"context": contexto_unido, "question": query})
+
+            linha_metrica = self._montar_linha(coluna, resultado, docs_usados)
+            print(f"✅ Sucesso: {coluna}")
+            return linha_metrica
+
+        except Exception as e:
+            print(f"❌ Erro em {coluna}: {e}")
+            return None
+
+    def _agrupar_metricas(self, docs_por_metrica):
+        """Agrupa métricas (por índice) cujos documentos recuperados se sobrepõem.
+
+        Cada métrica entra no grupo com maior Jaccard entre seus documentos e
+        os documentos do grupo, se passar de `limiar_sobreposicao` e o grupo
+        ainda tiver espaço; senão abre um grupo novo.
+        """
+        grupos = []
+        for i, docs in enumerate(docs_por_metrica):
+            conteudos = {d.page_content for d in docs}
+            melhor, melhor_similaridade = None, 0.0
+            for grupo in grupos:
+                if len(grupo["indices"]) >= self.max_metricas_por_grupo:
+                    continue
+                uniao = conteudos | grupo["conteudos"]
+                similaridade = len(conteudos & grupo["conteudos"]) / len(uniao) if uniao else 0.0
+                if similaridade > melhor_similaridade:
+                    melhor, melhor_similaridade = grupo, similaridade
+
+            if melhor is not None and melhor_similaridade >= self.limiar_sobreposicao:
+                melhor["indices"].append(i)
+                melhor["conteudos"] |= conteudos
+            else:
+                grupos.append({"indices": [i], "conteudos": set(conteudos)})
+        return [grupo["indices"] for grupo in grupos]
+
+    @staticmethod
+    def _unir_documentos(listas_docs):
+        vistos, unidos = set(), []
+        for docs in listas_docs:
+            for d in docs:
+                if d.page_content not in vistos:
+                    vistos.add(d.page_content)
+                    unidos.append(d)
+        return unidos
+
+    def _extrair_agrupado(self, metricas, retriever, extraction_chain, docs_por_metrica=None):
+        if docs_por_metrica is None:
+            docs_por_metrica = self.recuperar_em_lote([query for _, query in metricas], retriever)
+        grupos = self._agrupar_metricas(docs_por_metrica)
+        prompt_individual = self._prompt_extracao()
+        prompt_grupo = self._prompt_extracao_agrupada()
+        group_chain = prompt_grupo | RunnableLambda(self._invocar_llm)
+
+        def tokens_individual(i):
+            contexto, _, _, _ = self._montar_contexto(docs_por_metrica[i])
+            return self._estimar_tokens(prompt_individual.format(context=contexto, question=metricas[i][1]))
+
+        def extrair_grupo(indices):
+            """Retorna ({indice: linha}, chamadas, tokens_prompt)."""
+            if len(indices) == 1:
+                i = indices[0]
+                coluna, query = metricas[i]
+                tokens = tokens_individual(i)
+                return {i: self._extrair_metrica(coluna, query, retriever, extraction_chain, docs_por_metrica[i])}, 1, tokens
+
+            colunas = [metricas[i][0] for i in indices]
+            print(f"🔍 Extraindo em grupo: {', '.join(colunas)}")
+            contexto, docs_usados, bruto, tokens_contexto = self._montar_contexto(
+                self._unir_documentos(docs_por_metrica[i] for i in indices)
+            )
+            entrada = {
+                "context": contexto,
+                "questions": "\n".join(f"- {metricas[i][0]}: {metricas[i][1]}" for i in indices),
+            }
+            chamadas, tokens = 1, self._estimar_tokens(prompt_grupo.format(**entrada))
+            self._registrar_tokens(f"grupo ({', '.join(colunas)})", tokens, bruto, tokens_contexto)
+            paginas_usadas = {str(d.metadata.get("pg")) for d in docs_usados}
+            try:
+                resposta = group_chain.invoke(entrada)
             except Exception as e:
-                print(f"❌ Erro em {coluna}: {e}")
+                print(f"❌ Erro no grupo {', '.join(colunas)}: {e}")
+                resposta = {}
+
+            linhas = {}
+            for i in indices:
+                coluna, query = metricas[i]
+                resultado = resposta.get(coluna) if isinstance(resposta, dict) else None
+                if isinstance(resultado, dict) and "valor" in resultado:
+                    # Páginas da métrica que de fato couberam no contexto do grupo
+                    docs_metrica = [d for d in docs_por_metrica[i] if str(d.metadata.get("pg")) in paginas_usadas]
+                    linhas[i] = self._montar_linha(coluna, resultado, docs_metrica or docs_usados)
+                    print(f"✅ Sucesso: {coluna}")
+                    continue
+                # Métrica ausente da resposta do grupo: volta para o caminho individual
+                tokens += tokens_individual(i)
+                chamadas += 1
+                linhas[i] = self._extrair_metrica(coluna, query, retriever, extraction_chain, docs_por_metrica[i])
+            return linhas, chamadas, tokens
+
+        resultados = self._executar(extrair_grupo, grupos)
+
+        # Custo que o caminho individual teria, para comparação
+        total_individual = sum(tokens_individual(i) for i in range(len(metricas)))
+        chamadas_agrupado = sum(r[1] for r in resultados)
+        tokens_agrupado = sum(r[2] for r in resultados)
+        self.ultimo_relatorio_agrupamento = {
+            "metricas": len(metricas),
+            "grupos": len(grupos),
+            "chamadas_individual": len(metricas),
+            "chamadas_agrupado": chamadas_agrupado,
+            "tokens_prompt_individual": total_individual,
+            "tokens_prompt_agrupado": tokens_agrupado,
+        }
+        economia = 1 - tokens_agrupado / total_individual if total_individual else 0
+        print(
+            f"📉 Extração agrupada: {chamadas_agrupado} chamadas em vez de {len(metricas)}; "
+            f"~{tokens_agrupado} tokens de prompt em vez de ~{total_individual} ({economia:.0%} a menos)"
+        )
 
-        return tabela_auditoria # Retorna uma lista de linhas para o DataFrame
\ No newline at end of file
+        linhas_por_indice = {}
+        for linhas, _, _ in resultados:
+            linhas_por_indice.update(linhas)
+        return [linhas_por_indice[i] for i in range(len(metricas))]
@@ -0,0 +1,261 @@
+"""Backends de chat e embeddings do ESGMetricProcessor.
+
+- "openai": clientes reais (padrão).
+- "gravar": clientes reais, com cada resposta gravada num cassete JSONL.
+- "reproduzir": responde só a partir do cassete, sem rede, com latência
+  simulada opcional; uma chamada que não está no cassete é um erro.
+- "falso": totalmente offline, respostas determinísticas geradas a partir
+  do próprio prompt. Serve para medir o pipeline sem API.
+"""
+import json
+import os
+import re
+import threading
+import time
+import zlib
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.utils.hashing import hash_objeto
+
+MODOS = ("openai", "gravar", "reproduzir", "falso")
+
+
+class Cassete:
+    """Respostas gravadas, uma por linha: {"chave", "tipo", "valor"}.
+
+    O arquivo só recebe acréscimos, então uma gravação interrompida mantém
+    tudo o que já foi respondido.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._entradas = {}
+        self._lock = threading.Lock()
+        if os.path.exists(caminho):
+            with open(caminho, "r", encoding="utf-8") as f:
+                for linha in f:
+                    if linha.strip():
+                        entrada = json.loads(linha)
+                        self._entradas[entrada["chave"]] = entrada["valor"]
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def get(self, chave):
+        if chave not in self._entradas:
+            raise KeyError(f"Chamada ausente do cassete {self.caminho} ({chave[:12]}); grave-a com o backend 'gravar'")
+        return self._entradas[chave]
+
+    def gravar(self, chave, tipo, valor):
+        with self._lock:
+            if chave in self._entradas:
+                return
+            self._entradas[chave] = valor
+            pasta = os.path.dirname(self.caminho)
+            if pasta:
+                os.makedirs(pasta, exist_ok=True)
+            with open(self.caminho, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"chave": chave, "tipo": tipo, "valor": valor}, ensure_ascii=False) + "\n")
+
+
+def _chave_chat(nome_modelo, messages):
+    return hash_objeto(["chat", nome_modelo, [[m.type, m.content] for m in messages]])
+
+
+def _chave_embedding(nome_modelo, texto):
+    return hash_objeto(["embedding", nome_modelo, texto])
+
+
+def _resultado(texto):
+    return ChatResult(generations=[ChatGeneration(message=AIMessage(content=texto))])
+
+
+class ChatGravado(BaseChatModel):
+    """Chama o modelo real e grava o texto de cada resposta no cassete."""
+
+    modelo: BaseChatModel
+    cassete: Cassete
+    model_name: str = "gpt-4o"
+    temperature: float = 0
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def _llm_type(self):
+        return "chat-gravado"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        resposta = self.modelo.invoke(messages)
+        self.cassete.gravar(_chave_chat(self.model_name, messages), "chat", resposta.content)
+        return _resultado(resposta.content)
+
+
+class ChatReproduzido(BaseChatModel):
+    """Responde a partir do cassete, esperando `latencia` segundos por chamada."""
+
+    cassete: Cassete
+    model_name: str = "gpt-4o"
+    temperature: float = 0
+    latencia: float = 0.0
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    @property
+    def _llm_type(self):
+        return "chat-reproduzido"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        texto = self.cassete.get(_chave_chat(self.model_name, messages))
+        if self.latencia:
+            time.sleep(self.latencia)
+        return _resultado(texto)
+
+
+class ChatFalso(BaseChatModel):
+    """Chat offline: devolve JSON no formato que cada prompt do processador espera.
+
+    Descoberta: uma métrica fixa por subtema de diversidade. Extração: o
+    primeiro número do contexto e a linha em que ele aparece.
+    """
+
+    model_name: str = "falso"
+    temperature: float = 0
+    latencia: float = 0.0
+
+    @property
+    def _llm_type(self):
+        return "chat-falso"
+
+    @staticmethod
+    def _evidencia(contexto):
+        match = re.search(r"-?\d+(?:[.,]\d+)*\s*%?", contexto)
+        if not match:
+            return {"valor": None, "trecho_original": None}
+        inicio = contexto.rfind("\n", 0, match.start()) + 1
+        fim = contexto.find("\n", match.end())
+        return {"valor": match.group(0).strip(), "trecho_original": contexto[inicio:fim if fim != -1 else None].strip()}
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        texto = messages[-1].content
+        if self.latencia:
+            time.sleep(self.latencia)
+
+        if "Retire pelo menos 20 métricas" in texto:
+            resposta = {
+                f"percentual_{termo}": f"Qual o percentual de {termo} no quadro de colaboradores?"
+                for termo in ("mulheres", "homens", "negros", "pcd", "lideranca_feminina")
+            }
+        else:
+            contexto = texto.split("Contexto:", 1)[-1]
+            if "CADA métrica listada" in texto:
+                contexto, _, perguntas = contexto.partition("Métricas (nome: pergunta):")
+                nomes = re.findall(r"^\s*-\s*([^:\n]+):", perguntas, flags=re.MULTILINE)
+                resposta = {nome.strip(): self._evidencia(contexto) for nome in nomes}
+            else:
+                resposta = self._evidencia(contexto.split("Métrica:", 1)[0])
+        return _resultado(json.dumps(resposta, ensure_ascii=False))
+
+
+class EmbeddingsGravados(Embeddings):
+    def __init__(self, embeddings, cassete, model):
+        self.embeddings = embeddings
+        self.cassete = cassete
+        self.model = model
+
+    def embed_documents(self, texts):
+        vetores = self.embeddings.embed_documents(texts)
+        for texto, vetor in zip(texts, vetores):
+            self.cassete.gravar(_chave_embedding(self.model, texto), "embedding", list(vetor))
+        return vetores
+
+    def embed_query(self, text):
+        vetor = self.embeddings.embed_query(text)
+        self.cassete.gravar(_chave_embedding(self.model, "query:" + text), "embedding", list(vetor))
+        return vetor
+
+
+class EmbeddingsReproduzidos(Embeddings):
+    def __init__(self, cassete, model, latencia=0.0):
+        self.cassete = cassete
+        self.model = model
+        self.latencia = latencia
+
+    def embed_documents(self, texts):
+        if self.latencia:
+            time.sleep(self.latencia)
+        return [self.cassete.get(_chave_embedding(self.model, t)) for t in texts]
+
+    def embed_query(self, text):
+        if self.latencia:
+            time.sleep(self.latencia)
+        return self.cassete.get(_chave_embedding(self.model, "query:" + text))
+
+
+class EmbeddingsFalsos(Embeddings):
+    """Bag-of-words com hash: determinístico, offline e com alguma noção lexical."""
+
+    model = "falso"
+
+    def __init__(self, dimensao=256, latencia=0.0):
+        self.dimensao = dimensao
+        self.latencia = latencia
+
+    def _vetor(self, texto):
+        vetor = [0.0] * self.dimensao
+        for palavra in re.findall(r"\w+", texto.lower()):
+            vetor[zlib.crc32(palavra.encode()) % self.dimensao] += 1.0
+        return vetor
+
+    def embed_documents(self, texts):
+        if self.latencia:
+            time.sleep(self.latencia)
+        return [self._vetor(t) for t in texts]
+
+    def embed_query(self, text):
+        if self.latencia:
+            time.sleep(self.latencia)
+        return self._vetor(text)
+
+
+def criar_backends(modo, api_key=None, caminho_cassete=None, latencia=0.0,
+                   nome_modelo="gpt-4o", modelo_embeddings="text-embedding-ada-002", envolver_embeddings=None,
+                   registro=None):
+    """(chat, embeddings) para o modo pedido.
+
+    `envolver_embeddings` (ex.: o cache de embeddings) é aplicado ao backend
+    de embeddings antes da gravação, para que acertos do cache também vão
+    para o cassete. Com um `registro` (ClientRegistry), os clientes da
+    OpenAI e o pool HTTP deles são reaproveitados entre processadores.
+    """
+    envolver_embeddings = envolver_embeddings or (lambda embeddings: embeddings)
+    if modo not in MODOS:
+        raise ValueError(f"Backend desconhecido: {modo} (use {', '.join(MODOS)})")
+    if modo == "falso":
+        return ChatFalso(latencia=latencia), envolver_embeddings(EmbeddingsFalsos(latencia=latencia))
+    if modo in ("gravar", "reproduzir") and not caminho_cassete:
+        raise ValueError(f"O backend '{modo}' precisa de um arquivo de cassete")
+
+    if modo == "reproduzir":
+        cassete = Cassete(caminho_cassete)
+        print(f"📼 Reproduzindo {len(cassete)} respostas de {caminho_cassete}")
+        return (
+            ChatReproduzido(cassete=cassete, model_name=nome_modelo, latencia=latencia),
+            envolver_embeddings(EmbeddingsReproduzidos(cassete, modelo_embeddings, latencia)),
+        )
+
+    if registro is not None:
+        chat, embeddings = registro.clientes_openai(api_key, nome_modelo, modelo_embeddings)
+    else:
+        from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+        chat = ChatOpenAI(model_name=nome_modelo, temperature=0, api_key=api_key)
+        embeddings = OpenAIEmbeddings(model=modelo_embeddings, api_key=api_key)
+    embeddings = envolver_embeddings(embeddings)
+    if modo == "gravar":
+        cassete = Cassete(caminho_cassete)
+        print(f"📼 Gravando respostas em {caminho_cassete}")
+        return ChatGravado(modelo=chat, cassete=cassete, model_name=nome_modelo), EmbeddingsGravados(embeddings, cassete, modelo_embeddings)
+    return chat, embeddings
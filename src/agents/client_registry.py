@@ -0,0 +1,61 @@
+import threading
+
+import httpx
+
+
+class ClientRegistry:
+    """Clientes do LLM e de embeddings compartilhados por todo o processo.
+
+    Cada ESGMetricProcessor criava seus próprios ChatOpenAI/OpenAIEmbeddings,
+    e portanto um pool HTTP novo por relatório (nova conexão e novo handshake
+    TLS). O registro cria um único httpx.Client com keep-alive e entrega os
+    mesmos clientes para todos os processadores com a mesma chave e modelo.
+    Os clientes são seguros entre threads, então o modo em lote também os
+    compartilha.
+    """
+
+    def __init__(self, max_conexoes=20, max_conexoes_ociosas=10, keepalive_s=60.0,
+                 timeout_s=60.0, timeout_conexao_s=10.0, max_tentativas=2):
+        self.limites = httpx.Limits(
+            max_connections=max_conexoes,
+            max_keepalive_connections=max_conexoes_ociosas,
+            keepalive_expiry=keepalive_s,
+        )
+        self.timeout = httpx.Timeout(timeout_s, connect=timeout_conexao_s)
+        # Repetições do SDK; as de rate limit ficam com o RateLimiter do processador
+        self.max_tentativas = max_tentativas
+        self._http_client = None
+        self._clientes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def http_client(self):
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = httpx.Client(limits=self.limites, timeout=self.timeout)
+            return self._http_client
+
+    def clientes_openai(self, api_key, nome_modelo="gpt-4o", modelo_embeddings="text-embedding-ada-002"):
+        """(ChatOpenAI, OpenAIEmbeddings), criados uma vez por chave e modelos."""
+        chave = (api_key, nome_modelo, modelo_embeddings)
+        http_client = self.http_client
+        with self._lock:
+            if chave not in self._clientes:
+                from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+                opcoes = dict(api_key=api_key, http_client=http_client, timeout=self.timeout,
+                              max_retries=self.max_tentativas)
+                self._clientes[chave] = (
+                    ChatOpenAI(model_name=nome_modelo, temperature=0, **opcoes),
+                    OpenAIEmbeddings(model=modelo_embeddings, **opcoes),
+                )
+            return self._clientes[chave]
+
+    def info(self):
+        return {"clientes": len(self._clientes), "http_client_ativo": self._http_client is not None}
+
+    def fechar(self):
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            self._http_client = None
+            self._clientes.clear()
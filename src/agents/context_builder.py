@@ -0,0 +1,98 @@
+from itertools import groupby
+
+from langchain_core.documents import Document
+
+
+class ContextBuilder:
+    """Monta o contexto de um prompt de extração a partir dos documentos recuperados.
+
+    Os chunks do loader são janelas de texto da página; janelas da mesma
+    página que se sobrepõem (pelos offsets `inicio`/`fim`) são unidas num
+    único trecho, sem repetir o texto em comum. Documentos sem offsets são
+    descartados apenas se o texto já estiver contido em outro trecho.
+
+    Os trechos entram na ordem de relevância (melhor posição entre os
+    documentos que os formam) até o orçamento de tokens; o primeiro trecho
+    é truncado se sozinho já passar do orçamento. Cada trecho é devolvido
+    como um Document com a página de origem, para a coluna "Página".
+    """
+
+    def __init__(self, orcamento_tokens=1500, nome_modelo="gpt-4o"):
+        self.orcamento_tokens = orcamento_tokens
+        self._codificador = None
+        try:
+            import tiktoken
+            try:
+                self._codificador = tiktoken.encoding_for_model(nome_modelo)
+            except KeyError:
+                self._codificador = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            # Sem tiktoken (ou sem o arquivo de vocabulário): ~4 caracteres por token
+            self._codificador = None
+
+    def contar_tokens(self, texto):
+        if self._codificador is None:
+            return len(texto) // 4 + 1
+        return len(self._codificador.encode(texto, disallowed_special=()))
+
+    @staticmethod
+    def _texto(doc):
+        # Remove as reticências que o loader põe em volta da janela
+        texto = doc.page_content
+        return texto[3:-3] if texto.startswith("...") and texto.endswith("...") else texto
+
+    def _trechos(self, docs):
+        """Une janelas sobrepostas da mesma página: [{"pg", "texto", "rank"}]."""
+        com_offset, sem_offset = [], []
+        for rank, doc in enumerate(docs):
+            meta = doc.metadata
+            if isinstance(meta.get("inicio"), int) and isinstance(meta.get("fim"), int):
+                com_offset.append((rank, doc))
+            else:
+                sem_offset.append((rank, doc))
+
+        trechos = []
+        ordenados = sorted(com_offset, key=lambda item: (str(item[1].metadata.get("pg")), item[1].metadata["inicio"]))
+        for pg, itens in groupby(ordenados, key=lambda item: str(item[1].metadata.get("pg"))):
+            atual = None
+            for rank, doc in itens:
+                inicio, fim, texto = doc.metadata["inicio"], doc.metadata["fim"], self._texto(doc)
+                if atual is not None and inicio <= atual["fim"]:
+                    # Recortes do mesmo texto de página: só a parte nova é anexada
+                    if fim > atual["fim"]:
+                        atual["texto"] += texto[atual["fim"] - inicio:]
+                        atual["fim"] = fim
+                    atual["rank"] = min(atual["rank"], rank)
+                    continue
+                atual = {"pg": doc.metadata.get("pg"), "texto": texto, "fim": fim, "rank": rank}
+                trechos.append(atual)
+
+        for rank, doc in sem_offset:
+            texto = self._texto(doc)
+            if any(texto in t["texto"] for t in trechos):
+                continue
+            trechos.append({"pg": doc.metadata.get("pg", "N/A"), "texto": texto, "rank": rank})
+        return sorted(trechos, key=lambda t: t["rank"])
+
+    def montar(self, docs):
+        """Retorna (contexto, documentos_usados, tokens_do_contexto)."""
+        usados, partes, total = [], [], 0
+        for trecho in self._trechos(docs):
+            texto = f"...{trecho['texto']}..."
+            # +1 pela quebra de linha que separa os trechos
+            tokens = self.contar_tokens(texto) + (1 if partes else 0)
+            if self.orcamento_tokens and total + tokens > self.orcamento_tokens:
+                if usados:
+                    continue
+                texto = self._truncar(texto, self.orcamento_tokens)
+                tokens = self.contar_tokens(texto)
+            partes.append(texto)
+            usados.append(Document(page_content=texto, metadata={"pg": trecho["pg"]}))
+            total += tokens
+        contexto = "\n".join(partes)
+        return contexto, usados, self.contar_tokens(contexto)
+
+    def _truncar(self, texto, orcamento):
+        if self._codificador is None:
+            return texto[:orcamento * 4]
+        return self._codificador.decode(self._codificador.encode(texto, disallowed_special=())[:orcamento])
@@ -0,0 +1,82 @@
+from array import array
+
+from langchain_core.embeddings import Embeddings
+
+from src.utils.cache_store import SQLiteLRUStore
+from src.utils.hashing import hash_texto
+
+
+class CachedEmbeddings(Embeddings):
+    """Envolve um backend de embeddings com um cache persistente em SQLite.
+
+    A chave é o nome do modelo + hash do texto, então um chunk idêntico ao
+    de uma execução anterior não é enviado de novo à API. Apenas os textos
+    ausentes do cache são agrupados em uma única chamada ao backend. Os
+    vetores são guardados em float32.
+    """
+
+    def __init__(self, embeddings, caminho, tamanho_maximo_mb=1024, nome_modelo=None):
+        self.embeddings = embeddings
+        self.nome_modelo = nome_modelo or getattr(embeddings, "model", type(embeddings).__name__)
+        self.store = SQLiteLRUStore(caminho, int(tamanho_maximo_mb * 1024 * 1024))
+        self.acertos = 0
+        self.faltas = 0
+
+    def _chave(self, tipo, texto):
+        return f"{tipo}:{self.nome_modelo}:{hash_texto(texto)}"
+
+    @staticmethod
+    def _serializar(vetor):
+        return array("f", vetor).tobytes()
+
+    @staticmethod
+    def _desserializar(dados):
+        vetor = array("f")
+        vetor.frombytes(dados)
+        return vetor.tolist()
+
+    def embed_documents(self, texts):
+        vetores = [None] * len(texts)
+        faltantes = {}
+        for i, texto in enumerate(texts):
+            chave = self._chave("doc", texto)
+            dados = self.store.get(chave)
+            if dados is None:
+                # Textos repetidos no mesmo lote viram uma única requisição
+                faltantes.setdefault(chave, []).append(i)
+            else:
+                vetores[i] = self._desserializar(dados)
+
+        if faltantes:
+            novos = self.embeddings.embed_documents([texts[indices[0]] for indices in faltantes.values()])
+            for (chave, indices), vetor in zip(faltantes.items(), novos):
+                self.store.set(chave, self._serializar(vetor))
+                for i in indices:
+                    vetores[i] = vetor
+
+        self.faltas += len(faltantes)
+        self.acertos += len(texts) - len(faltantes)
+        return vetores
+
+    def embed_query(self, text):
+        chave = self._chave("query", text)
+        dados = self.store.get(chave)
+        if dados is not None:
+            self.acertos += 1
+            return self._desserializar(dados)
+
+        self.faltas += 1
+        vetor = self.embeddings.embed_query(text)
+        self.store.set(chave, self._serializar(vetor))
+        return vetor
+
+    def taxa_acerto(self):
+        total = self.acertos + self.faltas
+        return self.acertos / total if total else 0.0
+
+    def relatorio(self):
+        return f"💾 Cache de embeddings: {self.acertos} acertos, {self.faltas} faltas ({self.taxa_acerto():.0%} de acerto)"
+
+    def zerar_contadores(self):
+        self.acertos = 0
+        self.faltas = 0
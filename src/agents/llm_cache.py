@@ -0,0 +1,54 @@
+import json
+import threading
+
+from src.utils.cache_store import SQLiteLRUStore
+from src.utils.hashing import hash_objeto, hash_texto
+
+
+class LLMResponseCache:
+    """Cache persistente das respostas já interpretadas pelo parser.
+
+    A chave combina modelo, temperatura, hash do prompt renderizado e o
+    parser usado, então qualquer mudança de prompt, de chunks recuperados ou
+    de modelo gera uma chave nova. Entradas expiram após `ttl_horas` e o
+    arquivo respeita o limite de tamanho com despejo LRU.
+
+    Com `ignorar_leitura=True` (atualização forçada, gravação ou reprodução
+    de cassete) o cache nunca responde, mas continua sendo gravado com as
+    respostas novas.
+    """
+
+    def __init__(self, caminho, tamanho_maximo_mb=256, ttl_horas=24 * 30, ignorar_leitura=False):
+        ttl = ttl_horas * 3600 if ttl_horas else None
+        self.store = SQLiteLRUStore(caminho, int(tamanho_maximo_mb * 1024 * 1024), ttl_segundos=ttl)
+        self.ignorar_leitura = ignorar_leitura
+        self.acertos = 0
+        self.faltas = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def chave(nome_modelo, temperatura, prompt, parser):
+        return "llm:" + hash_objeto([nome_modelo, temperatura, hash_texto(prompt), parser])
+
+    def get(self, chave):
+        dados = None if self.ignorar_leitura else self.store.get(chave)
+        with self._lock:
+            if dados is None:
+                self.faltas += 1
+            else:
+                self.acertos += 1
+        return None if dados is None else json.loads(dados)
+
+    def set(self, chave, resposta):
+        self.store.set(chave, json.dumps(resposta, ensure_ascii=False).encode("utf-8"))
+
+    def zerar_contadores(self):
+        with self._lock:
+            self.acertos = 0
+            self.faltas = 0
+
+    def relatorio(self):
+        total = self.acertos + self.faltas
+        taxa = self.acertos / total if total else 0.0
+        sufixo = " — leitura desativada" if self.ignorar_leitura else ""
+        return f"💾 Cache do LLM: {self.acertos} acertos, {self.faltas} faltas ({taxa:.0%} de acerto){sufixo}"
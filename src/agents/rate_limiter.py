@@ -0,0 +1,75 @@
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """Balde de fichas com reposição contínua, seguro entre threads.
+
+    `consumir` bloqueia até haver fichas suficientes. Pedidos maiores que a
+    capacidade são limitados à capacidade, para nunca travarem para sempre.
+    """
+
+    def __init__(self, capacidade, reposicao_por_segundo):
+        self.capacidade = capacidade
+        self.reposicao_por_segundo = reposicao_por_segundo
+        self._fichas = capacidade
+        self._ultima_reposicao = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _repor(self):
+        agora = time.monotonic()
+        self._fichas = min(self.capacidade, self._fichas + (agora - self._ultima_reposicao) * self.reposicao_por_segundo)
+        self._ultima_reposicao = agora
+
+    def consumir(self, quantidade=1):
+        quantidade = min(quantidade, self.capacidade)
+        while True:
+            with self._lock:
+                self._repor()
+                if self._fichas >= quantidade:
+                    self._fichas -= quantidade
+                    return
+                espera = (quantidade - self._fichas) / self.reposicao_por_segundo
+            time.sleep(espera)
+
+
+class RateLimiter:
+    """Limites de requisições por minuto (RPM) e tokens por minuto (TPM).
+
+    Qualquer um dos dois pode ser None para ficar sem limite.
+    """
+
+    def __init__(self, requisicoes_por_minuto=None, tokens_por_minuto=None):
+        self.requisicoes = TokenBucket(requisicoes_por_minuto, requisicoes_por_minuto / 60) if requisicoes_por_minuto else None
+        self.tokens = TokenBucket(tokens_por_minuto, tokens_por_minuto / 60) if tokens_por_minuto else None
+
+    def aguardar(self, tokens_estimados=0):
+        if self.requisicoes is not None:
+            self.requisicoes.consumir(1)
+        if self.tokens is not None and tokens_estimados:
+            self.tokens.consumir(tokens_estimados)
+
+
+def eh_erro_de_limite(erro):
+    """Reconhece erros de rate limit (HTTP 429) sem depender do SDK do provedor."""
+    if getattr(erro, "status_code", None) == 429:
+        return True
+    resposta = getattr(erro, "response", None)
+    if getattr(resposta, "status_code", None) == 429:
+        return True
+    return "ratelimit" in type(erro).__name__.lower()
+
+
+def executar_com_retentativas(funcao, max_tentativas=5, espera_base=1.0, espera_maxima=30.0):
+    """Executa `funcao`, repetindo com backoff exponencial e jitter completo
+    apenas quando o erro é de rate limit."""
+    for tentativa in range(max_tentativas):
+        try:
+            return funcao()
+        except Exception as e:
+            if not eh_erro_de_limite(e) or tentativa == max_tentativas - 1:
+                raise
+            espera = random.uniform(0, min(espera_maxima, espera_base * 2 ** tentativa))
+            print(f"⏳ Rate limit atingido; nova tentativa em {espera:.1f}s")
+            time.sleep(espera)
@@ -0,0 +1,77 @@
+import re
+import unicodedata
+
+PADRAO_PERCENTUAL = re.compile(r"\d+(?:[.,]\d+)*\s*%")
+# Outro número com casas decimais no trecho (ex.: "81,1" de uma tabela) torna o valor ambíguo
+PADRAO_DECIMAL = re.compile(r"\d[.,]\d")
+
+
+class RegexMetricExtractor:
+    """Caminho determinístico da extração híbrida.
+
+    O loader já extrai por regex um valor numérico de cada chunk e o marca
+    com o indicador GRI. Uma métrica do catálogo é resolvida sem o LLM
+    quando todos os chunks do seu indicador que contêm as `palavras_chave`
+    (e nenhum termo de `excluir`) trazem um único percentual, sem outros
+    números decimais por perto, e concordam no mesmo valor. Qualquer
+    ambiguidade (valores diferentes, trecho com vários números, nenhuma
+    evidência) deixa a métrica para o LLM.
+    """
+
+    def __init__(self, catalogo):
+        self.catalogo = catalogo
+
+    @staticmethod
+    def _normalizar(texto):
+        sem_acento = unicodedata.normalize("NFKD", texto).encode("ascii", "ignore").decode("ascii")
+        return sem_acento.lower()
+
+    @classmethod
+    def _contem(cls, texto, termos):
+        """Todos os termos presentes; "a|b" aceita qualquer alternativa."""
+        return all(any(cls._normalizar(alt) in texto for alt in termo.split("|")) for termo in termos)
+
+    @classmethod
+    def _contem_algum(cls, texto, termos):
+        return any(cls._normalizar(alt) in texto for termo in termos for alt in termo.split("|"))
+
+    @staticmethod
+    def _valor_inequivoco(chunk):
+        """O valor do loader, se o trecho tiver só esse número relevante; senão None."""
+        valores = set(chunk.get("valores", [chunk.get("valor")])) - {None}
+        percentuais = PADRAO_PERCENTUAL.findall(chunk["contexto"])
+        if len(valores) != 1 or len(percentuais) != 1:
+            return None
+        if PADRAO_DECIMAL.search(PADRAO_PERCENTUAL.sub(" ", chunk["contexto"])):
+            return None
+        return valores.pop()
+
+    def extrair(self, chunks, chaves=None):
+        """{chave: (valor, chunk)} das métricas resolvidas sem ambiguidade.
+
+        `chaves` restringe às métricas pedidas (ex.: as que serão extraídas).
+        """
+        textos = [self._normalizar(c["contexto"]) for c in chunks]
+        resolvidas = {}
+        for indicador, chave, entrada in self.catalogo.entradas():
+            palavras = entrada.get("palavras_chave")
+            if not palavras or (chaves is not None and chave not in chaves):
+                continue
+
+            evidencias = {}
+            for chunk, texto in zip(chunks, textos):
+                if indicador not in chunk.get("indicadores", [chunk.get("indicador_id")]):
+                    continue
+                if not self._contem(texto, palavras) or self._contem_algum(texto, entrada.get("excluir", [])):
+                    continue
+                valor = self._valor_inequivoco(chunk)
+                if valor is None:
+                    # Vários números no mesmo trecho: não dá para saber qual é o da métrica
+                    evidencias = None
+                    break
+                evidencias.setdefault(valor, chunk)
+
+            if evidencias and len(evidencias) == 1:
+                valor, chunk = next(iter(evidencias.items()))
+                resolvidas[chave] = (valor, chunk)
+        return resolvidas
@@ -0,0 +1,129 @@
+import json
+import os
+import uuid
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+
+
+class NumpyVectorIndex(VectorStore):
+    """Índice vetorial exato (similaridade de cosseno) em memória, sobre NumPy.
+
+    Pensado para os poucos milhares de chunks de um relatório: a busca é um
+    produto matriz-vetor seguido de top-k, sem cliente nem servidor. Os
+    vetores ficam normalizados em float32.
+
+    Com `diretorio`, o índice é gravado em `vetores.npy` + `documentos.json`
+    e reaberto com `carregar`, que mapeia os vetores em memória (memmap) em
+    vez de lê-los inteiros.
+    """
+
+    ARQUIVO_VETORES = "vetores.npy"
+    ARQUIVO_DOCUMENTOS = "documentos.json"
+
+    def __init__(self, embedding, diretorio=None, metadata=None):
+        self._embedding = embedding
+        self.diretorio = diretorio
+        # Metadados do índice (ex.: impressão digital dos chunks), gravados junto
+        self.metadata = dict(metadata or {})
+        self.vetores = np.zeros((0, 0), dtype=np.float32)
+        self.documentos = []
+
+    @property
+    def embeddings(self):
+        return self._embedding
+
+    @staticmethod
+    def _normalizar(matriz):
+        matriz = np.asarray(matriz, dtype=np.float32)
+        normas = np.linalg.norm(matriz, axis=-1, keepdims=True)
+        return matriz / np.maximum(normas, 1e-12)
+
+    def __len__(self):
+        return len(self.documentos)
+
+    def add_texts(self, texts, metadatas=None, ids=None, **kwargs):
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        novos = self._normalizar(self._embedding.embed_documents(texts))
+
+        self.vetores = novos if not len(self) else np.vstack([self.vetores, novos])
+        self.documentos.extend(
+            Document(id=id_, page_content=texto, metadata=dict(meta or {}))
+            for id_, texto, meta in zip(ids, texts, metadatas)
+        )
+        if self.diretorio:
+            self.salvar()
+        return ids
+
+    def buscar_por_vetores(self, vetores, k=4):
+        """Top-k de várias consultas de uma vez: [[(indice, similaridade), ...], ...]."""
+        if not len(self):
+            return [[] for _ in range(len(vetores))]
+        k = min(k, len(self))
+        similaridades = self._normalizar(vetores) @ self.vetores.T
+        candidatos = np.argpartition(-similaridades, k - 1, axis=1)[:, :k]
+        ordem = np.take_along_axis(-similaridades, candidatos, axis=1).argsort(axis=1, kind="stable")
+        melhores = np.take_along_axis(candidatos, ordem, axis=1)
+        return [
+            [(int(j), float(similaridades[i, j])) for j in linha]
+            for i, linha in enumerate(melhores)
+        ]
+
+    def similarity_search_with_score(self, query, k=4, **kwargs):
+        vetor = self._embedding.embed_query(query)
+        return [(self.documentos[j], s) for j, s in self.buscar_por_vetores([vetor], k)[0]]
+
+    def similarity_search_by_vector(self, embedding, k=4, **kwargs):
+        return [self.documentos[j] for j, _ in self.buscar_por_vetores([embedding], k)[0]]
+
+    def similarity_search(self, query, k=4, **kwargs):
+        return [doc for doc, _ in self.similarity_search_with_score(query, k)]
+
+    def _select_relevance_score_fn(self):
+        # O score já é a similaridade de cosseno
+        return lambda score: score
+
+    def get_by_ids(self, ids):
+        por_id = {d.id: d for d in self.documentos}
+        return [por_id[i] for i in ids if i in por_id]
+
+    @classmethod
+    def from_texts(cls, texts, embedding, metadatas=None, ids=None, diretorio=None, metadata=None, **kwargs):
+        indice = cls(embedding, diretorio=diretorio, metadata=metadata)
+        indice.add_texts(texts, metadatas, ids)
+        return indice
+
+    def salvar(self):
+        os.makedirs(self.diretorio, exist_ok=True)
+        caminho_vetores = os.path.join(self.diretorio, self.ARQUIVO_VETORES)
+        caminho_documentos = os.path.join(self.diretorio, self.ARQUIVO_DOCUMENTOS)
+        # Grava em arquivos temporários e troca: um memmap aberto nunca vê o arquivo truncado
+        with open(caminho_vetores + ".tmp", "wb") as f:
+            np.save(f, np.ascontiguousarray(self.vetores))
+        with open(caminho_documentos + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({
+                "metadata": self.metadata,
+                "documentos": [[d.id, d.page_content, d.metadata] for d in self.documentos],
+            }, f, ensure_ascii=False)
+        os.replace(caminho_vetores + ".tmp", caminho_vetores)
+        os.replace(caminho_documentos + ".tmp", caminho_documentos)
+        self.vetores = np.load(caminho_vetores, mmap_mode="r")
+
+    @classmethod
+    def carregar(cls, diretorio, embedding):
+        """Reabre um índice salvo, ou devolve None se não houver um completo."""
+        caminho_vetores = os.path.join(diretorio, cls.ARQUIVO_VETORES)
+        caminho_documentos = os.path.join(diretorio, cls.ARQUIVO_DOCUMENTOS)
+        if not (os.path.exists(caminho_vetores) and os.path.exists(caminho_documentos)):
+            return None
+        with open(caminho_documentos, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+        indice = cls(embedding, diretorio=diretorio, metadata=dados["metadata"])
+        indice.documentos = [Document(id=i, page_content=t, metadata=m) for i, t, m in dados["documentos"]]
+        indice.vetores = np.load(caminho_vetores, mmap_mode="r")
+        return indice
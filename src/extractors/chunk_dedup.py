@@ -0,0 +1,146 @@
+import re
+import zlib
+from itertools import groupby
+
+
+class ChunkDeduplicator:
+    """Reduz os chunks do loader antes da vetorização.
+
+    1. Janelas sobrepostas na mesma página (um chunk por indicador e por
+       percentual vizinho) viram um único chunk com a lista de indicadores,
+       chaves e valores que cobriam aquele trecho.
+    2. Textos quase idênticos (mesma tabela repetida em páginas diferentes,
+       rodapés etc.) são detectados por MinHash sobre shingles de palavras e
+       descartados, mantendo o primeiro e herdando seus indicadores/valores.
+    """
+
+    def __init__(self, tamanho_maximo=600, limiar_similaridade=0.9, tamanho_shingle=3,
+                 num_permutacoes=64, bandas=16):
+        # Limite de caracteres de um chunk fundido, para não perder granularidade na busca
+        self.tamanho_maximo = tamanho_maximo
+        self.limiar_similaridade = limiar_similaridade
+        self.tamanho_shingle = tamanho_shingle
+        self.num_permutacoes = num_permutacoes
+        self.bandas = bandas
+        self._linhas_por_banda = num_permutacoes // bandas
+        # Coeficientes fixos (a*x + b mod primo) para que as assinaturas sejam reprodutíveis
+        primo = (1 << 61) - 1
+        self._primo = primo
+        self._coeficientes = [
+            (zlib.crc32(f"a{i}".encode()) * 2654435761 % primo or 1, zlib.crc32(f"b{i}".encode()) % primo)
+            for i in range(num_permutacoes)
+        ]
+
+    @staticmethod
+    def _texto(chunk):
+        # Remove apenas as reticências adicionadas pelo loader ("...texto...")
+        return chunk["contexto"][3:-3]
+
+    @staticmethod
+    def _acumular(destino, origem):
+        for campo_lista, campo in (("indicadores", "indicador_id"), ("chaves", "chave"), ("valores", "valor")):
+            for item in origem.get(campo_lista, [origem[campo]]):
+                if item not in destino[campo_lista]:
+                    destino[campo_lista].append(item)
+
+    def _novo_grupo(self, chunk):
+        grupo = {
+            "indicador_id": chunk["indicador_id"],
+            "chave": chunk["chave"],
+            "valor": chunk["valor"],
+            "indicadores": [],
+            "chaves": [],
+            "valores": [],
+            "contexto": chunk["contexto"],
+            "pagina": chunk["pagina"],
+            "inicio": chunk["inicio"],
+            "fim": chunk["fim"],
+        }
+        self._acumular(grupo, chunk)
+        return grupo, self._texto(chunk)
+
+    def fundir_sobrepostos(self, chunks):
+        """Funde janelas sobrepostas ou encostadas da mesma página."""
+        resultado = []
+        ordenados = sorted(chunks, key=lambda c: (c["pagina"], c["inicio"], c["fim"]))
+        for _, chunks_pagina in groupby(ordenados, key=lambda c: c["pagina"]):
+            grupo, texto = None, ""
+            for chunk in chunks_pagina:
+                novo_fim = max(grupo["fim"], chunk["fim"]) if grupo else None
+                if (grupo is not None and chunk["inicio"] <= grupo["fim"]
+                        and novo_fim - grupo["inicio"] <= self.tamanho_maximo):
+                    # As janelas são recortes do mesmo texto de página, então basta
+                    # anexar a parte do novo chunk que passa do fim do grupo
+                    if chunk["fim"] > grupo["fim"]:
+                        texto += self._texto(chunk)[grupo["fim"] - chunk["inicio"]:]
+                        grupo["fim"] = chunk["fim"]
+                    self._acumular(grupo, chunk)
+                    continue
+
+                if grupo is not None:
+                    grupo["contexto"] = f"...{texto}..."
+                    resultado.append(grupo)
+                grupo, texto = self._novo_grupo(chunk)
+
+            grupo["contexto"] = f"...{texto}..."
+            resultado.append(grupo)
+        return resultado
+
+    def _shingles(self, texto):
+        palavras = re.findall(r"\w+", texto.lower())
+        n = self.tamanho_shingle
+        if len(palavras) < n:
+            return {" ".join(palavras)}
+        return {" ".join(palavras[i:i + n]) for i in range(len(palavras) - n + 1)}
+
+    def _assinatura(self, shingles):
+        hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+        return [min((a * h + b) % self._primo for h in hashes) for a, b in self._coeficientes]
+
+    def remover_quase_duplicados(self, chunks):
+        """Descarta chunks cujo Jaccard de shingles com um chunk anterior passa do limiar.
+
+        O MinHash com bandas (LSH) só aponta candidatos; a decisão final usa
+        o Jaccard exato dos shingles.
+        """
+        mantidos = []
+        shingles_mantidos = []
+        baldes = {}
+        for chunk in chunks:
+            shingles = self._shingles(self._texto(chunk))
+            assinatura = self._assinatura(shingles)
+            chaves_bandas = [
+                (b, tuple(assinatura[b * self._linhas_por_banda:(b + 1) * self._linhas_por_banda]))
+                for b in range(self.bandas)
+            ]
+
+            candidatos = {i for chave in chaves_bandas for i in baldes.get(chave, [])}
+            duplicado_de = None
+            for i in sorted(candidatos):
+                outro = shingles_mantidos[i]
+                if len(shingles & outro) / len(shingles | outro) >= self.limiar_similaridade:
+                    duplicado_de = i
+                    break
+
+            if duplicado_de is not None:
+                self._acumular(mantidos[duplicado_de], chunk)
+                continue
+
+            for chave in chaves_bandas:
+                baldes.setdefault(chave, []).append(len(mantidos))
+            mantidos.append(chunk)
+            shingles_mantidos.append(shingles)
+        return mantidos
+
+    def deduplicar(self, chunks):
+        if not chunks:
+            return []
+        fundidos = self.fundir_sobrepostos(chunks)
+        resultado = self.remover_quase_duplicados(fundidos)
+        reducao = 1 - len(resultado) / len(chunks)
+        print(
+            f"🧹 Deduplicação: {len(chunks)} → {len(resultado)} chunks "
+            f"({len(chunks) - len(fundidos)} fundidos, {len(fundidos) - len(resultado)} quase duplicados; "
+            f"redução de {reducao:.1%})"
+        )
+        return resultado
@@ -1,81 +1,329 @@
 import pdfplumber
+import pypdfium2 as pdfium
 import pandas as pd
 import re
 import json
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from src.extractors.indicator_matcher import IndicatorMatcher
+from src.extractors.layout_engine import montar_texto
+from src.utils.hashing import hash_arquivo, hash_objeto
+from src.utils.numeric_normalizer import normalizar_serie
+
+# Incrementar sempre que o formato dos chunks mudar, invalidando o cache de chunks
+VERSAO_CHUNKS = 3
+
+# O PDFium não é thread-safe, nem entre documentos diferentes: toda chamada ao
+# pypdfium2 neste processo passa por este lock
+_LOCK_PDFIUM = threading.Lock()
 
 
 class ESGDocumentLoader:
-    def __init__(self, configuracao, x_tolerance=3, y_tolerance=3):
+    def __init__(self, configuracao, x_tolerance=3, y_tolerance=3, gap_coluna=20, n_workers=1, paginas_por_lote=10, prefiltro=True, cache=None,
+                 memoria_limitada=False, paginas_por_janela=25):
         self.config = configuracao
         self.x_tolerance = x_tolerance
         self.y_tolerance = y_tolerance
+        # Distância horizontal mínima entre palavras para abrir nova coluna
+        self.gap_coluna = gap_coluna
+        # n_workers > 1 ativa o modo paralelo: as páginas são divididas em lotes
+        # e cada processo abre o PDF por conta própria
+        self.n_workers = n_workers
+        self.paginas_por_lote = paginas_por_lote
+        # Descarta páginas sem "%" ou sem termos dos indicadores antes do layout
+        self.prefiltro = prefiltro
+        # Memória limitada: reabre o PDF a cada janela de páginas e libera cada página após o uso
+        self.memoria_limitada = memoria_limitada
+        self.paginas_por_janela = max(1, paginas_por_janela)
+        # ExtractionCache opcional com texto de layout e chunks por página
+        self.cache = cache
+        # Configuração compilada uma única vez em um matcher de múltiplos padrões
+        self.matcher = IndicatorMatcher(configuracao)
+        # Resumo do pré-filtro da última leitura concluída
+        self.ultimo_prefiltro = None
+
+    def __getstate__(self):
+        # A conexão SQLite do cache não atravessa processos; os workers do
+        # modo paralelo só extraem, quem grava no cache é o processo principal
+        estado = self.__dict__.copy()
+        estado["cache"] = None
+        return estado
 
     def _extrair_texto_estruturado(self, page):
         words = page.extract_words(x_tolerance=self.x_tolerance, y_tolerance=self.y_tolerance)
-        if not words: return ""
-
-        words_sorted = sorted(words, key=lambda x: x['x0'])
-        colunas = []
-        if words_sorted:
-            curr_col = [words_sorted[0]]
-            for i in range(1, len(words_sorted)):
-                if words_sorted[i]['x0'] - words_sorted[i-1]['x1'] > 20:
-                    colunas.append(curr_col)
-                    curr_col = []
-                curr_col.append(words_sorted[i])
-            colunas.append(curr_col)
-
-        texto_final = []
-        for col in colunas:
-            linhas = {}
-            for w in col:
-                y = round(w['top'])
-                found = False
-                for r_y in linhas.keys():
-                    if abs(y - r_y) <= 3:
-                        linhas[r_y].append(w); found = True; break
-                if not found: linhas[y] = [w]
-            
-            texto_col = [" ".join([w['text'] for w in sorted(linhas[y], key=lambda x: x['x0'])]) 
-                         for y in sorted(linhas.keys())]
-            texto_final.append("\n".join(texto_col))
-
-        return "\n\n[QUEBRA_DE_COLUNA]\n\n".join(texto_final)
-
-    def extract_content(self,pdf_path, configuracao):
-        dados_finais = {"metadata": {"empresa": "Bradesco", "ano": 2024}, "chunks": []}
-        
-        with pdfplumber.open(pdf_path) as pdf:
-            for i, page in enumerate(pdf.pages):
-
-                texto_formatado = self._extrair_texto_estruturado(page)
-
-                for gri_id, info in configuracao.items():
-                    id_limpo = gri_id.replace("GRI ", "")
-                    
-                    if id_limpo in texto_formatado or any(k in texto_formatado.lower() for k in info["subtemas"]):
-                        
-  
-                        pattern = r"(\d{1,3}(?:[\.,]\d+)?)\s*%"
-                        matches = re.finditer(pattern, texto_formatado)
-                        
-                        for match in matches:
-                  
-                            janela = 70 
-                            inicio = max(0, match.start() - janela)
-                            fim = min(len(texto_formatado), match.end() + janela)
-                            contexto = texto_formatado[inicio:fim].strip()
-
-                            if id_limpo in contexto or any(k in contexto.lower() for k in info["subtemas"]):
-                                valor_num = float(match.group(1).replace(".", "").replace(",", "."))
-                                
-                                chunk = {
-                                    "indicador_id": gri_id,
-                                    "chave": info["id_dashboard"],
-                                    "valor": valor_num,
-                                    "contexto": f"...{contexto}...",
-                                    "pagina": i + 1
-                                }
-                                dados_finais["chunks"].append(chunk)
+        return montar_texto(words, gap_coluna=self.gap_coluna)
+
+    def _obter_matcher(self, configuracao):
+        if configuracao is self.config:
+            return self.matcher
+        return IndicatorMatcher(configuracao)
+
+    def _processar_pagina(self, page, indice, configuracao, matcher):
+        """Extrai o texto de layout e os chunks de uma única página (índice começando em 0)."""
+        texto_formatado = self._extrair_texto_estruturado(page)
+        return texto_formatado, self._gerar_chunks(texto_formatado, indice, configuracao, matcher)
+
+    def _gerar_chunks(self, texto_formatado, indice, configuracao, matcher):
+        chunks = []
+        ocorrencias = matcher.buscar(texto_formatado)
+        if not ocorrencias:
+            return chunks
+
+        pattern = r"(\d{1,3}(?:[\.,]\d+)?)\s*%"
+        matches = list(re.finditer(pattern, texto_formatado))
+
+        for gri_id, info in configuracao.items():
+            if gri_id not in ocorrencias:
+                continue
+
+            for match in matches:
+
+                janela = 70
+                inicio = max(0, match.start() - janela)
+                fim = min(len(texto_formatado), match.end() + janela)
+
+                if matcher.possui_ocorrencia(ocorrencias[gri_id], inicio, fim):
+                    janela_bruta = texto_formatado[inicio:fim]
+                    contexto = janela_bruta.strip()
+                    # Offsets do contexto no texto da página, usados na deduplicação
+                    inicio_contexto = inicio + len(janela_bruta) - len(janela_bruta.lstrip())
+
+                    chunk = {
+                        "indicador_id": gri_id,
+                        "chave": info["id_dashboard"],
+                        # Texto do percentual; vira número em _normalizar_valores, uma vez por lote
+                        "valor": match.group(0),
+                        "contexto": f"...{contexto}...",
+                        "pagina": indice + 1,
+                        "inicio": inicio_contexto,
+                        "fim": inicio_contexto + len(contexto)
+                    }
+                    chunks.append(chunk)
+
+        return chunks
+
+    @staticmethod
+    def _normalizar_valores(chunks_por_pagina):
+        """Converte o "valor" textual dos chunks de várias páginas em número com
+        uma única chamada a normalizar_serie ("36.5%" -> 36.5, "14,2%" -> 14.2)."""
+        chunks = [chunk for lista in chunks_por_pagina for chunk in lista]
+        if not chunks:
+            return
+        valores = normalizar_serie(pd.Series([c["valor"] for c in chunks], dtype=object))["valor"].tolist()
+        for chunk, valor in zip(chunks, valores):
+            chunk["valor"] = valor
+
+    def _paginas_candidatas(self, pdf_path, indices, matcher):
+        """Leitura rápida do texto bruto (pdfium) para descartar páginas que não
+        podem gerar chunk antes da reconstrução de layout do pdfplumber."""
+        candidatas = []
+        with _LOCK_PDFIUM:
+            pdf = pdfium.PdfDocument(pdf_path)
+            try:
+                for indice in indices:
+                    page = pdf[indice]
+                    textpage = page.get_textpage()
+                    if matcher.pode_gerar_chunk(textpage.get_text_range()):
+                        candidatas.append(indice)
+                    textpage.close()
+                    page.close()
+            finally:
+                pdf.close()
+        return candidatas
+
+    def _iterar_lote(self, pdf_path, indices, configuracao, estatistica):
+        """Gera (pagina, chunks, texto_layout) para cada página do lote, na ordem,
+        e preenche `estatistica` com os números do pré-filtro. O texto é None
+        nas páginas descartadas pelo pré-filtro. As páginas saem em grupos de
+        `paginas_por_lote`, com os valores dos chunks já normalizados."""
+        matcher = self._obter_matcher(configuracao)
+
+        inicio = time.perf_counter()
+        candidatas = self._paginas_candidatas(pdf_path, indices, matcher) if self.prefiltro else list(indices)
+        estatistica.update({
+            "paginas_total": len(indices),
+            "paginas_descartadas": len(indices) - len(candidatas),
+            "tempo_prefiltro_s": time.perf_counter() - inicio,
+            "tempo_extracao_s": 0.0,
+        })
+
+        candidatas_set = set(candidatas)
+        paginas_pdf = self._abrir_paginas(pdf_path, candidatas)
+        # Páginas retidas até completar `paginas_por_lote`, para normalizar os valores de uma vez
+        retidas = []
+        for indice in indices:
+            if indice not in candidatas_set:
+                retidas.append((indice + 1, [], None))
+            else:
+                _, page = next(paginas_pdf)
+                inicio = time.perf_counter()
+                texto, chunks = self._processar_pagina(page, indice, configuracao, matcher)
+                estatistica["tempo_extracao_s"] += time.perf_counter() - inicio
+                retidas.append((indice + 1, chunks, texto))
+            if len(retidas) >= self.paginas_por_lote:
+                self._normalizar_valores(chunks for _, chunks, _ in retidas)
+                yield from retidas
+                retidas = []
+        paginas_pdf.close()
+        self._normalizar_valores(chunks for _, chunks, _ in retidas)
+        yield from retidas
+
+    def _abrir_paginas(self, pdf_path, indices):
+        """Gera (indice, page) abrindo o PDF apenas com as páginas pedidas.
+
+        No modo de memória limitada o documento é reaberto a cada janela de
+        `paginas_por_janela` páginas e cada página é fechada depois de usada,
+        descartando os objetos que o pdfplumber/pdfminer mantêm em cache.
+        """
+        if not indices:
+            return
+        tamanho = self.paginas_por_janela if self.memoria_limitada else len(indices)
+        for inicio in range(0, len(indices), tamanho):
+            janela = indices[inicio:inicio + tamanho]
+            with pdfplumber.open(pdf_path, pages=[i + 1 for i in janela]) as pdf:
+                for indice, page in zip(janela, pdf.pages):
+                    yield indice, page
+                    if self.memoria_limitada:
+                        page.close()
+
+    def _processar_lote(self, pdf_path, indices, configuracao):
+        """Versão não preguiçosa de _iterar_lote, usada pelos processos do pool."""
+        estatistica = {}
+        paginas = list(self._iterar_lote(pdf_path, indices, configuracao, estatistica))
+        return paginas, estatistica
+
+    def _listar_paginas(self, pdf_path):
+        # pdfium conta as páginas sem instanciar um objeto Page do pdfplumber por página
+        with _LOCK_PDFIUM:
+            pdf = pdfium.PdfDocument(pdf_path)
+            try:
+                return list(range(len(pdf)))
+            finally:
+                pdf.close()
+
+    def contar_paginas(self, pdf_path):
+        return len(self._listar_paginas(pdf_path))
+
+    def _dividir_em_lotes(self, indices):
+        return [indices[i:i + self.paginas_por_lote] for i in range(0, len(indices), self.paginas_por_lote)]
+
+    @staticmethod
+    def _resumir_prefiltro(estatisticas):
+        resumo = {
+            chave: sum(e[chave] for e in estatisticas)
+            for chave in ("paginas_total", "paginas_descartadas", "tempo_prefiltro_s", "tempo_extracao_s")
+        }
+        # Estimativa: páginas descartadas custariam o mesmo que a média das processadas
+        processadas = resumo["paginas_total"] - resumo["paginas_descartadas"]
+        custo_medio = resumo["tempo_extracao_s"] / processadas if processadas else 0
+        resumo["tempo_economizado_s"] = max(
+            0.0, resumo["paginas_descartadas"] * custo_medio - resumo["tempo_prefiltro_s"]
+        )
+        return resumo
+
+    def metadata_documento(self, pdf_path):
+        return {"empresa": "Bradesco", "ano": 2024}
+
+    def _parametros_layout(self):
+        return (self.x_tolerance, self.y_tolerance, self.gap_coluna)
+
+    def _consultar_cache(self, pdf_hash, indices, configuracao, matcher):
+        """Separa as páginas já resolvidas pelo cache das que exigem abrir o PDF.
+
+        Páginas com texto de layout em cache mas sem chunks para a configuração
+        atual são resolvidas aqui mesmo, só refazendo a busca de indicadores.
+        """
+        parametros = self._parametros_layout()
+        config_hash = hash_objeto([VERSAO_CHUNKS, configuracao])
+        prontas, pendentes, refeitas = {}, [], {}
+        for indice in indices:
+            chunks = self.cache.get_chunks(pdf_hash, indice, parametros, config_hash)
+            if chunks is None:
+                texto = self.cache.get_layout(pdf_hash, indice, parametros)
+                if texto is not None:
+                    chunks = refeitas[indice] = self._gerar_chunks(texto, indice, configuracao, matcher)
+            if chunks is None:
+                pendentes.append(indice)
+            else:
+                prontas[indice] = chunks
+        self._normalizar_valores(refeitas.values())
+        for indice, chunks in refeitas.items():
+            self.cache.set_chunks(pdf_hash, indice, parametros, config_hash, chunks)
+        return prontas, pendentes, config_hash
+
+    def _iterar_pendentes(self, pdf_path, pendentes, configuracao, estatisticas):
+        if not pendentes:
+            return
+
+        if self.n_workers > 1 and len(pendentes) > self.paginas_por_lote:
+            lotes = self._dividir_em_lotes(pendentes)
+            # executor.map preserva a ordem dos lotes, então o resultado é
+            # idêntico ao da leitura sequencial
+            with ProcessPoolExecutor(max_workers=self.n_workers) as executor:
+                for paginas, estatistica in executor.map(self._processar_lote, repeat(pdf_path), lotes, repeat(configuracao)):
+                    estatisticas.append(estatistica)
+                    yield from paginas
+        else:
+            estatistica = {}
+            estatisticas.append(estatistica)
+            yield from self._iterar_lote(pdf_path, pendentes, configuracao, estatistica)
+
+    def iter_paginas(self, pdf_path, configuracao=None, paginas=None):
+        """Gera (pagina, chunks_da_pagina) em ordem, à medida que cada página fica pronta.
+
+        No modo paralelo os lotes chegam na ordem original; páginas sem chunks
+        também são emitidas (com lista vazia) para quem acompanha o progresso.
+        Com cache configurado, só as páginas ausentes do cache abrem o PDF.
+        `paginas` restringe a leitura a um subconjunto de índices (base 0).
+        """
+        configuracao = self.config if configuracao is None else configuracao
+        matcher = self._obter_matcher(configuracao)
+        indices = self._listar_paginas(pdf_path)
+        if paginas is not None:
+            indices = [i for i in paginas if 0 <= i < len(indices)]
+        estatisticas = []
+
+        prontas, pendentes = {}, indices
+        if self.cache is not None:
+            pdf_hash = hash_arquivo(pdf_path)
+            parametros = self._parametros_layout()
+            prontas, pendentes, config_hash = self._consultar_cache(pdf_hash, indices, configuracao, matcher)
+            print(f"💾 Cache de extração: {len(prontas)}/{len(indices)} páginas reaproveitadas")
+
+        resultados = self._iterar_pendentes(pdf_path, pendentes, configuracao, estatisticas)
+        for indice in indices:
+            if indice in prontas:
+                yield indice + 1, prontas.pop(indice)
+                continue
+
+            pagina, chunks, texto = next(resultados)
+            if self.cache is not None:
+                if texto is not None:
+                    self.cache.set_layout(pdf_hash, indice, parametros, texto)
+                self.cache.set_chunks(pdf_hash, indice, parametros, config_hash, chunks)
+            yield pagina, chunks
+
+        self.ultimo_prefiltro = None
+        if self.prefiltro and estatisticas:
+            self.ultimo_prefiltro = self._resumir_prefiltro(estatisticas)
+            print(
+                f"⏭️ Pré-filtro: {self.ultimo_prefiltro['paginas_descartadas']}/{self.ultimo_prefiltro['paginas_total']} "
+                f"páginas descartadas (~{self.ultimo_prefiltro['tempo_economizado_s']:.1f}s economizados)"
+            )
+
+    def iter_chunks(self, pdf_path, configuracao=None, paginas=None):
+        """Gera os chunks página a página, sem acumular o documento inteiro."""
+        for _, chunks in self.iter_paginas(pdf_path, configuracao, paginas):
+            yield from chunks
+
+    def extract_content(self, pdf_path, configuracao):
+        dados_finais = {"metadata": self.metadata_documento(pdf_path), "chunks": []}
+        dados_finais["chunks"].extend(self.iter_chunks(pdf_path, configuracao))
+
+        if self.ultimo_prefiltro:
+            dados_finais["metadata"]["prefiltro"] = self.ultimo_prefiltro
 
         return dados_finais
@@ -0,0 +1,92 @@
+import re
+import unicodedata
+from bisect import bisect_left
+
+
+class IndicatorMatcher:
+    """Compila o esg_indicadores.json em uma única regex de múltiplos padrões.
+
+    Os termos de busca de cada indicador são o código sem o prefixo "GRI "
+    (ex: "405-1") e todos os seus subtemas. A página é convertida para
+    minúsculas uma única vez e varrida uma única vez; o resultado é, para
+    cada indicador, a lista ordenada de ocorrências (inicio, fim).
+    """
+
+    def __init__(self, configuracao):
+        self.indicadores = list(configuracao.keys())
+        self._indicadores_por_termo = {}
+        for gri_id, info in configuracao.items():
+            termos = [gri_id.replace("GRI ", "")] + list(info["subtemas"])
+            for termo in termos:
+                termo = termo.lower()
+                if termo:
+                    self._indicadores_por_termo.setdefault(termo, []).append(gri_id)
+
+        # Os termos mais longos vêm primeiro na alternância, então cada posição
+        # casa com o maior termo possível. Qualquer outro termo que comece na
+        # mesma posição é necessariamente prefixo dele, por isso guardamos os
+        # prefixos de cada termo para recuperá-los sem uma nova varredura.
+        termos_ordenados = sorted(self._indicadores_por_termo, key=len, reverse=True)
+        self._prefixos = {
+            termo: [t for t in termos_ordenados if termo.startswith(t)]
+            for termo in termos_ordenados
+        }
+        alternancia = "|".join(re.escape(t) for t in termos_ordenados)
+        self._regex = re.compile(f"(?=({alternancia}))") if termos_ordenados else None
+
+        # Versão sem espaços dos termos, usada no pré-filtro sobre o texto bruto
+        termos_compactos = {re.sub(r"\s+", "", t) for t in termos_ordenados}
+        self._regex_prefiltro = (
+            re.compile("|".join(re.escape(t) for t in sorted(termos_compactos, key=len, reverse=True)))
+            if termos_compactos else None
+        )
+
+    @staticmethod
+    def _minusculas_alinhadas(texto):
+        texto_lower = texto.lower()
+        if len(texto_lower) == len(texto):
+            return texto_lower
+        # Alguns caracteres (ex: "İ") crescem ao virar minúsculos; mantemos um
+        # caractere por posição para que os offsets continuem válidos
+        return "".join(c.lower()[0] for c in texto)
+
+    def buscar(self, texto):
+        """Retorna {gri_id: [(inicio, fim), ...]} apenas dos indicadores encontrados."""
+        ocorrencias = {}
+        if self._regex is None:
+            return ocorrencias
+
+        for match in self._regex.finditer(self._minusculas_alinhadas(texto)):
+            inicio = match.start()
+            for termo in self._prefixos[match.group(1)]:
+                fim = inicio + len(termo)
+                for gri_id in self._indicadores_por_termo[termo]:
+                    ocorrencias.setdefault(gri_id, []).append((inicio, fim))
+
+        for lista in ocorrencias.values():
+            lista.sort()
+        return ocorrencias
+
+    def pode_gerar_chunk(self, texto_bruto):
+        """Pré-filtro conservador sobre o texto bruto da página.
+
+        Uma página só gera chunks se tiver um "%" e ao menos um termo de algum
+        indicador. Espaços e quebras de linha são removidos dos dois lados,
+        porque a ordem/espaçamento do texto bruto difere do texto reconstruído
+        pelo layout; assim o filtro pode deixar passar páginas a mais, mas
+        não descarta páginas que produziriam chunk.
+        """
+        if "%" not in texto_bruto or self._regex_prefiltro is None:
+            return False
+        compacto = re.sub(r"\s+", "", unicodedata.normalize("NFKC", texto_bruto).lower())
+        return self._regex_prefiltro.search(compacto) is not None
+
+    @staticmethod
+    def possui_ocorrencia(ocorrencias, inicio, fim):
+        """Verifica se alguma ocorrência cabe inteira na janela [inicio, fim)."""
+        pos = bisect_left(ocorrencias, (inicio,))
+        while pos < len(ocorrencias) and ocorrencias[pos][0] < fim:
+            if ocorrencias[pos][1] <= fim:
+                return True
+            pos += 1
+        return False
@@ -0,0 +1,55 @@
+SEPARADOR_COLUNA = "\n\n[QUEBRA_DE_COLUNA]\n\n"
+
+
+def agrupar_colunas(words, gap_coluna=20):
+    """Ordena as palavras por x0 e abre uma nova coluna sempre que o espaço
+    horizontal entre palavras consecutivas passa de `gap_coluna`."""
+    words_sorted = sorted(words, key=lambda x: x['x0'])
+    colunas = []
+    curr_col = [words_sorted[0]]
+    for anterior, atual in zip(words_sorted, words_sorted[1:]):
+        if atual['x0'] - anterior['x1'] > gap_coluna:
+            colunas.append(curr_col)
+            curr_col = []
+        curr_col.append(atual)
+    colunas.append(curr_col)
+    return colunas
+
+
+def agrupar_linhas(coluna, tolerancia_linha=3):
+    """Agrupa as palavras de uma coluna em linhas pelo `top` arredondado.
+
+    Cada linha é identificada pelo primeiro `top` que a abriu. Como as chaves
+    são inteiras, basta consultar os baldes de y - tolerância até
+    y + tolerância em vez de percorrer todas as linhas já criadas; entre os
+    candidatos vence a linha aberta primeiro, exatamente como na varredura
+    original.
+    """
+    linhas = {}
+    ordem_criacao = {}
+    for w in coluna:
+        y = round(w['top'])
+        destino = None
+        for r_y in range(y - tolerancia_linha, y + tolerancia_linha + 1):
+            if r_y in linhas and (destino is None or ordem_criacao[r_y] < ordem_criacao[destino]):
+                destino = r_y
+        if destino is None:
+            ordem_criacao[y] = len(ordem_criacao)
+            linhas[y] = [w]
+        else:
+            linhas[destino].append(w)
+
+    # As palavras chegam ordenadas por x0, então cada linha já está em ordem
+    return [linhas[y] for y in sorted(linhas)]
+
+
+def montar_texto(words, gap_coluna=20, tolerancia_linha=3):
+    """Reconstrói o texto da página coluna a coluna, linha a linha."""
+    if not words: return ""
+
+    texto_final = []
+    for col in agrupar_colunas(words, gap_coluna):
+        texto_col = [" ".join(w['text'] for w in linha) for linha in agrupar_linhas(col, tolerancia_linha)]
+        texto_final.append("\n".join(texto_col))
+
+    return SEPARADOR_COLUNA.join(texto_final)
@@ -0,0 +1,111 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+class SQLiteLRUStore:
+    """Armazenamento chave/valor persistente em SQLite com limite de tamanho.
+
+    Cada entrada guarda o momento do último acesso; quando o total de bytes
+    passa de `tamanho_maximo_bytes`, as entradas usadas há mais tempo são
+    removidas (LRU). Com `ttl_segundos`, entradas mais antigas que isso são
+    tratadas como ausentes e apagadas na leitura. Seguro para uso entre
+    threads e entre processos que abrem o mesmo arquivo.
+    """
+
+    def __init__(self, caminho, tamanho_maximo_bytes, ttl_segundos=None):
+        self.caminho = caminho
+        self.tamanho_maximo_bytes = tamanho_maximo_bytes
+        self.ttl_segundos = ttl_segundos
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS entradas (
+                chave TEXT PRIMARY KEY,
+                valor BLOB NOT NULL,
+                tamanho INTEGER NOT NULL,
+                criado_em REAL NOT NULL,
+                ultimo_acesso REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ultimo_acesso ON entradas (ultimo_acesso)")
+        self._conn.commit()
+        self._tamanho_total = self._somar_tamanho()
+
+    def _somar_tamanho(self):
+        return self._conn.execute("SELECT COALESCE(SUM(tamanho), 0) FROM entradas").fetchone()[0]
+
+    def get(self, chave):
+        with self._lock:
+            linha = self._conn.execute("SELECT valor, criado_em FROM entradas WHERE chave = ?", (chave,)).fetchone()
+            if linha is None:
+                return None
+            agora = time.time()
+            if self.ttl_segundos is not None and agora - linha[1] > self.ttl_segundos:
+                self._conn.execute("DELETE FROM entradas WHERE chave = ?", (chave,))
+                self._conn.commit()
+                self._tamanho_total -= len(linha[0])
+                return None
+            self._conn.execute("UPDATE entradas SET ultimo_acesso = ? WHERE chave = ?", (agora, chave))
+            self._conn.commit()
+            return linha[0]
+
+    def set(self, chave, valor):
+        agora = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entradas (chave, valor, tamanho, criado_em, ultimo_acesso) VALUES (?, ?, ?, ?, ?)",
+                (chave, valor, len(valor), agora, agora),
+            )
+            self._conn.commit()
+            self._tamanho_total += len(valor)
+            if self._tamanho_total > self.tamanho_maximo_bytes:
+                self._evictar()
+
+    def delete(self, chave):
+        with self._lock:
+            self._conn.execute("DELETE FROM entradas WHERE chave = ?", (chave,))
+            self._conn.commit()
+            self._tamanho_total = self._somar_tamanho()
+
+    def _evictar(self):
+        # O total em memória é aproximado quando outros processos escrevem no
+        # mesmo arquivo, então recalculamos antes de remover
+        self._tamanho_total = self._somar_tamanho()
+        excesso = self._tamanho_total - self.tamanho_maximo_bytes
+        if excesso <= 0:
+            return
+
+        remover = []
+        for chave, tamanho in self._conn.execute("SELECT chave, tamanho FROM entradas ORDER BY ultimo_acesso"):
+            remover.append((chave,))
+            excesso -= tamanho
+            if excesso <= 0:
+                break
+        self._conn.executemany("DELETE FROM entradas WHERE chave = ?", remover)
+        self._conn.commit()
+        self._tamanho_total = self._somar_tamanho()
+
+    def info(self, prefixo=""):
+        with self._lock:
+            entradas, tamanho = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM entradas WHERE substr(chave, 1, ?) = ?",
+                (len(prefixo), prefixo),
+            ).fetchone()
+        return {"entradas": entradas, "tamanho_bytes": tamanho}
+
+    def purge(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entradas")
+            self._conn.commit()
+            self._conn.execute("VACUUM")
+            self._tamanho_total = 0
+
+    def close(self):
+        self._conn.close()
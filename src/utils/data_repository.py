@@ -19,4 +19,53 @@ class DataRepository:
     def save_final_csv(registro, filename="base_power_bi.csv"):
         df = pd.DataFrame([registro])
         df.to_csv(filename, index=False, sep=";", encoding="utf-8-sig")
-        print(f"📊 CSV para Power BI salvo em: {filename}")
\ No newline at end of file
+        print(f"📊 CSV para Power BI salvo em: {filename}")
+
+
+class ChunkJsonlWriter:
+    """Grava chunks em JSON Lines (um chunk por linha) à medida que as páginas
+    terminam, permitindo acompanhar o arquivo antes do fim da leitura do PDF.
+
+    O arquivo só é criado na primeira escrita, então documentos sem nenhum
+    chunk não deixam arquivo vazio para trás. Com `metadata` (empresa, ano),
+    a primeira linha é o registro de cabeçalho {"metadata": {...}}.
+    """
+
+    def __init__(self, filename, metadata=None):
+        self.filename = filename
+        self.metadata = metadata
+        self.total = 0
+        self._arquivo = None
+
+    def write(self, chunks):
+        if not chunks:
+            return
+        if self._arquivo is None:
+            self._arquivo = open(self.filename, "w", encoding="utf-8")
+            if self.metadata is not None:
+                self._arquivo.write(json.dumps({"metadata": self.metadata}, ensure_ascii=False) + "\n")
+        for chunk in chunks:
+            self._arquivo.write(json.dumps(chunk, ensure_ascii=False) + "\n")
+        self._arquivo.flush()
+        self.total += len(chunks)
+
+    def close(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def read(filename):
+        """Lê os chunks de um arquivo JSON Lines de forma preguiçosa, sem o cabeçalho."""
+        with open(filename, "r", encoding="utf-8") as f:
+            for linha in f:
+                if linha.strip():
+                    registro = json.loads(linha)
+                    if "metadata" not in registro:
+                        yield registro
@@ -0,0 +1,52 @@
+import json
+
+from src.utils.cache_store import SQLiteLRUStore
+
+
+class ExtractionCache:
+    """Cache em disco do texto de layout e dos chunks de cada página.
+
+    - Texto de layout: chave = hash do PDF + página + x/y_tolerance + gap de coluna.
+    - Chunks: mesma chave + hash da configuração de indicadores.
+
+    Assim, mudar apenas o esg_indicadores.json reaproveita o layout já
+    reconstruído, e mudar apenas um parâmetro de layout recalcula só o que
+    depende dele.
+    """
+
+    def __init__(self, caminho, tamanho_maximo_mb=512):
+        self.store = SQLiteLRUStore(caminho, int(tamanho_maximo_mb * 1024 * 1024))
+
+    @staticmethod
+    def _chave_layout(pdf_hash, indice, parametros_layout):
+        return "layout:" + ":".join(str(p) for p in (pdf_hash, indice, *parametros_layout))
+
+    @staticmethod
+    def _chave_chunks(pdf_hash, indice, parametros_layout, config_hash):
+        return "chunks:" + ":".join(str(p) for p in (pdf_hash, indice, *parametros_layout, config_hash))
+
+    def get_layout(self, pdf_hash, indice, parametros_layout):
+        valor = self.store.get(self._chave_layout(pdf_hash, indice, parametros_layout))
+        return None if valor is None else valor.decode("utf-8")
+
+    def set_layout(self, pdf_hash, indice, parametros_layout, texto):
+        self.store.set(self._chave_layout(pdf_hash, indice, parametros_layout), texto.encode("utf-8"))
+
+    def get_chunks(self, pdf_hash, indice, parametros_layout, config_hash):
+        valor = self.store.get(self._chave_chunks(pdf_hash, indice, parametros_layout, config_hash))
+        return None if valor is None else json.loads(valor)
+
+    def set_chunks(self, pdf_hash, indice, parametros_layout, config_hash, chunks):
+        valor = json.dumps(chunks, ensure_ascii=False).encode("utf-8")
+        self.store.set(self._chave_chunks(pdf_hash, indice, parametros_layout, config_hash), valor)
+
+    def info(self):
+        return {
+            "caminho": self.store.caminho,
+            "limite_bytes": self.store.tamanho_maximo_bytes,
+            "layout": self.store.info("layout:"),
+            "chunks": self.store.info("chunks:"),
+        }
+
+    def purge(self):
+        self.store.purge()
@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog é opcional: sem ele a pasta é varrida periodicamente
+    Observer = None
+    FileSystemEventHandler = object
+
+
+class _Eventos(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.watcher.sinalizar(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.watcher.sinalizar(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.watcher.sinalizar(event.dest_path)
+
+
+class FolderWatcher:
+    """Observa uma pasta e entrega cada PDF novo, já completo, a `ao_encontrar(caminho)`.
+
+    Com o pacote watchdog (inotify no Linux) os arquivos são notificados
+    assim que aparecem; sem ele, ou se o observador não iniciar, a pasta é
+    varrida a cada `intervalo_s`. Mesmo com watchdog há uma varredura lenta
+    de segurança, para eventos perdidos. Um arquivo só é entregue depois
+    que tamanho e data de modificação ficam iguais por `estabilidade_s`
+    (cópias ainda em andamento não são lidas pela metade). Um mesmo estado
+    de arquivo é entregue uma única vez, a menos que `ao_encontrar` retorne
+    False: aí ele volta a ser oferecido na próxima varredura completa.
+    """
+
+    def __init__(self, pasta, ao_encontrar, intervalo_s=5.0, estabilidade_s=2.0, extensao=".pdf"):
+        self.pasta = pasta
+        self.ao_encontrar = ao_encontrar
+        self.intervalo_s = intervalo_s
+        self.estabilidade_s = estabilidade_s
+        self.extensao = extensao
+        self.modo = "polling"
+        self._candidatos = {}
+        self._entregues = {}
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._parar = threading.Event()
+        self._observer = None
+        self._thread = None
+
+    def sinalizar(self, caminho):
+        """Marca um arquivo para verificação imediata (chamado pelos eventos do watchdog)."""
+        if caminho.lower().endswith(self.extensao):
+            with self._lock:
+                self._candidatos.setdefault(caminho, None)
+            self._acordar.set()
+
+    def iniciar(self):
+        if Observer is not None:
+            try:
+                self._observer = Observer()
+                self._observer.schedule(_Eventos(self), self.pasta, recursive=False)
+                self._observer.start()
+                self.modo = "inotify"
+            except Exception as e:
+                print(f"⚠️ Observador de arquivos indisponível ({e}); usando varredura periódica")
+                self._observer = None
+        self._thread = threading.Thread(target=self._executar, name="folder-watcher", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self._acordar.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _varrer(self):
+        with self._lock:
+            for nome in os.listdir(self.pasta):
+                if nome.lower().endswith(self.extensao):
+                    self._candidatos.setdefault(os.path.join(self.pasta, nome), None)
+
+    def _verificar_candidatos(self):
+        """Entrega os candidatos estáveis; retorna se ainda há algum aguardando."""
+        agora = time.monotonic()
+        with self._lock:
+            candidatos = list(self._candidatos.items())
+        for caminho, anterior in candidatos:
+            try:
+                estado = os.stat(caminho)
+                assinatura = (estado.st_size, estado.st_mtime_ns)
+            except FileNotFoundError:
+                with self._lock:
+                    self._candidatos.pop(caminho, None)
+                    self._entregues.pop(caminho, None)
+                continue
+
+            if self._entregues.get(caminho) == assinatura:
+                with self._lock:
+                    self._candidatos.pop(caminho, None)
+                continue
+            if anterior is None or anterior[0] != assinatura:
+                # Primeira vez visto, ou ainda mudando: espera estabilizar
+                with self._lock:
+                    self._candidatos[caminho] = (assinatura, agora)
+                continue
+            if agora - anterior[1] < self.estabilidade_s:
+                continue
+
+            with self._lock:
+                self._candidatos.pop(caminho, None)
+            if self.ao_encontrar(caminho) is not False:
+                self._entregues[caminho] = assinatura
+        with self._lock:
+            return bool(self._candidatos)
+
+    def _executar(self):
+        # Com inotify a varredura completa é só uma rede de segurança
+        intervalo_varredura = self.intervalo_s if self._observer is None else max(60.0, self.intervalo_s)
+        ultima_varredura = None
+        while not self._parar.is_set():
+            if ultima_varredura is None or time.monotonic() - ultima_varredura >= intervalo_varredura:
+                self._varrer()
+                ultima_varredura = time.monotonic()
+            try:
+                aguardando = self._verificar_candidatos()
+            except Exception as e:
+                print(f"⚠️ Erro ao verificar {self.pasta}: {e}")
+                aguardando = False
+            espera = min(self.estabilidade_s / 2, self.intervalo_s) if aguardando else self.intervalo_s
+            self._acordar.wait(espera)
+            self._acordar.clear()
@@ -0,0 +1,20 @@
+import hashlib
+import json
+
+
+def hash_arquivo(caminho, tamanho_bloco=1024 * 1024):
+    """SHA-256 do conteúdo do arquivo, lido em blocos."""
+    sha = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def hash_texto(texto):
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def hash_objeto(obj):
+    """SHA-256 de um objeto serializável em JSON, independente da ordem das chaves."""
+    return hash_texto(json.dumps(obj, sort_keys=True, ensure_ascii=False))
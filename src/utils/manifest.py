@@ -0,0 +1,85 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ProcessingManifest:
+    """Índice persistente dos PDFs já processados, por hash de conteúdo.
+
+    Cada entrada guarda o nome do arquivo, o número de páginas, a versão do
+    pipeline que o processou e os caminhos dos artefatos gerados (CSV, JSONL
+    de auditoria, diário). A consulta é por chave primária, então decidir se
+    um PDF (com qualquer nome) já foi processado não depende do tamanho do
+    histórico. Seguro entre threads e processos que abrem o mesmo arquivo.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS pdfs (
+                pdf_hash TEXT PRIMARY KEY,
+                arquivo TEXT NOT NULL,
+                paginas INTEGER,
+                versao_pipeline TEXT NOT NULL,
+                artefatos TEXT NOT NULL,
+                processado_em REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def consultar(self, pdf_hash, versao_pipeline=None):
+        """A entrada do PDF, ou None se ele nunca foi processado.
+
+        Com `versao_pipeline`, entradas geradas por outra versão também
+        contam como ausentes (o PDF precisa ser reprocessado).
+        """
+        with self._lock:
+            linha = self._conn.execute(
+                "SELECT arquivo, paginas, versao_pipeline, artefatos, processado_em FROM pdfs WHERE pdf_hash = ?",
+                (pdf_hash,),
+            ).fetchone()
+        if linha is None:
+            return None
+        arquivo, paginas, versao, artefatos, processado_em = linha
+        if versao_pipeline is not None and versao != str(versao_pipeline):
+            return None
+        return {
+            "pdf_hash": pdf_hash,
+            "arquivo": arquivo,
+            "paginas": paginas,
+            "versao_pipeline": versao,
+            "artefatos": json.loads(artefatos),
+            "processado_em": processado_em,
+        }
+
+    def registrar(self, pdf_hash, arquivo, paginas, versao_pipeline, artefatos):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pdfs VALUES (?, ?, ?, ?, ?, ?)",
+                (pdf_hash, arquivo, paginas, str(versao_pipeline), json.dumps(artefatos, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+    def remover(self, pdf_hash):
+        with self._lock:
+            self._conn.execute("DELETE FROM pdfs WHERE pdf_hash = ?", (pdf_hash,))
+            self._conn.commit()
+
+    def info(self):
+        with self._lock:
+            total, paginas = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(paginas), 0) FROM pdfs").fetchone()
+            versoes = dict(self._conn.execute("SELECT versao_pipeline, COUNT(*) FROM pdfs GROUP BY versao_pipeline"))
+        return {"caminho": self.caminho, "pdfs": total, "paginas": paginas, "versoes": versoes}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
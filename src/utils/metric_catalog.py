@@ -0,0 +1,100 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+
+CAMINHO_CATALOGO = "src/utils/catalogo_metricas.json"
+
+
+class MetricCatalog:
+    """Catálogo persistente de métricas por indicador GRI.
+
+    Cada indicador mapeia chaves canônicas em snake_case para a pergunta de
+    extração: {"GRI 405-1": {"percentual_mulheres_quadro": {"pergunta": ...}}}.
+    O processador extrai direto do catálogo, o que mantém as colunas do CSV
+    estáveis entre relatórios; a descoberta pelo LLM só acrescenta métricas
+    novas quando o catálogo é expandido.
+
+    Entradas podem ter `palavras_chave` (todas obrigatórias; "a|b" aceita
+    qualquer alternativa) e `excluir`, usadas pela extração híbrida para
+    aceitar o valor do loader sem chamar o LLM.
+
+    As expansões ficam em um arquivo à parte (`caminho_expansoes`), somado ao
+    catálogo base na leitura. Sem esse caminho, expandir só altera a memória.
+    """
+
+    def __init__(self, caminho=CAMINHO_CATALOGO, caminho_expansoes=None):
+        self.caminho = caminho
+        self.caminho_expansoes = caminho_expansoes
+        self.indicadores = self._ler(caminho)
+        # Só as métricas vindas da descoberta, que é o que salvar() grava
+        self.expansoes = self._ler(caminho_expansoes) if caminho_expansoes else {}
+        for indicador, metricas in self.expansoes.items():
+            for chave, entrada in metricas.items():
+                self.indicadores.setdefault(indicador, {}).setdefault(chave, entrada)
+        # Um mesmo catálogo pode ser expandido por vários documentos em paralelo
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _ler(caminho):
+        if not os.path.exists(caminho):
+            return {}
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def normalizar_chave(nome):
+        """'% Mulheres na Liderança' -> 'mulheres_na_lideranca'."""
+        sem_acento = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode("ascii")
+        return re.sub(r"[^a-z0-9]+", "_", sem_acento.lower()).strip("_")
+
+    def __len__(self):
+        return sum(len(metricas) for metricas in self.indicadores.values())
+
+    def metricas(self, indicadores=None):
+        """{chave: pergunta} dos indicadores pedidos (todos, se None), na ordem do arquivo."""
+        return {chave: entrada["pergunta"] for _, chave, entrada in self.entradas(indicadores)}
+
+    def entradas(self, indicadores=None):
+        """[(indicador, chave, entrada)] dos indicadores pedidos, na ordem do arquivo."""
+        with self._lock:
+            return [
+                (indicador, chave, entrada)
+                for indicador, metricas in self.indicadores.items()
+                if indicadores is None or indicador in indicadores
+                for chave, entrada in metricas.items()
+            ]
+
+    def adicionar(self, indicador, nome, pergunta):
+        """Inclui a métrica se a chave normalizada ainda não existe em nenhum indicador.
+
+        Retorna a chave criada ou None.
+        """
+        chave = self.normalizar_chave(nome)
+        if not chave or any(chave in metricas for metricas in self.indicadores.values()):
+            return None
+        entrada = {"pergunta": pergunta}
+        self.indicadores.setdefault(indicador, {})[chave] = entrada
+        self.expansoes.setdefault(indicador, {})[chave] = entrada
+        return chave
+
+    def expandir(self, indicador, descobertas):
+        """Acrescenta as métricas descobertas pelo LLM e grava as expansões."""
+        with self._lock:
+            novas = [
+                chave for chave in (self.adicionar(indicador, nome, pergunta) for nome, pergunta in descobertas.items())
+                if chave
+            ]
+            if novas:
+                self.salvar()
+        return novas
+
+    def salvar(self):
+        if not self.caminho_expansoes:
+            return
+        temporario = self.caminho_expansoes + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.expansoes, f, ensure_ascii=False, indent=4)
+            f.write("\n")
+        os.replace(temporario, self.caminho_expansoes)
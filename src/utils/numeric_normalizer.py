@@ -0,0 +1,116 @@
+"""Normalização de valores numéricos em pt-BR, para valores isolados e Series.
+
+Regras de separador (aplicadas ao número encontrado no texto):
+- "." e "," juntos: o que aparece por último é o decimal ("1.234,5" e "1,234.5");
+- só ",": uma vírgula é decimal ("12,5"), várias são milhar ("1,234,567");
+- só ".": vários pontos são milhar ("1.234.567"); um ponto seguido de
+  exatamente 3 dígitos também ("14.806"), exceto "0.xxx"; fora isso é decimal ("36.5").
+
+Sinal negativo só conta colado ao número e no início do texto ou após
+espaço ("-0,7%"); um traço solto ("Mulheres – 36%") não é sinal.
+Percentuais ficam em pontos percentuais ("36%" -> 36.0, unidade "%").
+Faixas ("30% a 40%", "28-33%") viram o ponto médio, com mínimo e máximo.
+Com traço, só há faixa se o segundo número traz "%" ou unidade, o que
+exclui códigos GRI ("405-1") e períodos ("2023-2024"); "e" não é faixa.
+"mil", "milhões" e "bilhões" multiplicam valores que não são percentuais.
+
+As regras rodam com padrões pré-compilados sobre cada texto. normalizar_valor
+atende um valor sem montar Series; normalizar_serie processa lotes, com cada
+texto distinto avaliado uma única vez. Nos benchmarks isso supera as
+operações .str do pandas, que também percorrem os textos em Python.
+"""
+import re
+
+import pandas as pd
+
+_NUMERO = r"\d(?:[\d.,]*\d)?"
+_UNIDADE_FAIXA = r"%|por cento|t\s*co2|co2\s*e|co₂|mwh|gj\b"
+PADRAO_VALOR = (
+    rf"(?:(?<![\w%])(?P<sinal>[-−])(?=\d))?(?P<n1>{_NUMERO})(?:\s*%)?"
+    rf"(?:(?:\s+(?:a|até)\s+|\s*[-–—]\s*(?={_NUMERO}\s*(?:{_UNIDADE_FAIXA})))(?P<n2>{_NUMERO}))?"
+    r"\s*(?P<escala>mil\b|milh|bilh)?"
+)
+
+ESCALAS = {"mil": 1e3, "milh": 1e6, "bilh": 1e9}
+
+# (padrão na string em minúsculas, unidade canônica)
+UNIDADES = [
+    (r"%|por cento", "%"),
+    (r"t\s*co2|co2\s*e|co₂|toneladas de (?:co2|carbono)", "tCO2e"),
+    (r"mwh", "MWh"),
+    (r"\bgj\b", "GJ"),
+    (r"r\$", "R$"),
+]
+
+# Uma única busca para todas as unidades: cada unidade é um grupo da alternância
+PADRAO_UNIDADE = "|".join(f"({padrao})" for padrao, _ in UNIDADES)
+
+_VALOR_RE = re.compile(PADRAO_VALOR)
+_UNIDADE_RE = re.compile(PADRAO_UNIDADE)
+_MILHAR_COM_PONTO_RE = re.compile(r"[1-9]\d{0,2}\.\d{3}")
+
+
+def normalizar_serie(serie):
+    """Normaliza uma Series de textos ("14.806", "-0,7%", "1,2 mil tCO2e", "30% a 40%").
+
+    Retorna um DataFrame com o mesmo índice e as colunas valor, unidade,
+    minimo e maximo (float; NaN quando não há número).
+    """
+    texto = pd.Series(serie, copy=False)
+    # Cada texto distinto é processado uma vez (valores se repetem muito nos relatórios)
+    codigos, unicos = pd.factorize(texto.where(texto.notna(), ""), use_na_sentinel=False)
+    resultado = pd.DataFrame(
+        [_normalizar_texto(str(u)) for u in unicos],
+        columns=["valor", "unidade", "minimo", "maximo"],
+    ).astype({"valor": float, "minimo": float, "maximo": float})
+    return resultado.iloc[codigos].set_axis(texto.index)
+
+
+def _para_float(numero):
+    """Converte um número com separadores pt-BR/en em float (None se vazio)."""
+    if numero is None:
+        return None
+    n_pontos = numero.count(".")
+    n_virgulas = numero.count(",")
+    if n_pontos and n_virgulas:
+        if numero.rfind(",") > numero.rfind("."):
+            numero = numero.replace(".", "").replace(",", ".")
+        else:
+            numero = numero.replace(",", "")
+    elif n_virgulas == 1:
+        numero = numero.replace(",", ".")
+    elif n_virgulas > 1:
+        numero = numero.replace(",", "")
+    elif n_pontos > 1 or _MILHAR_COM_PONTO_RE.fullmatch(numero):
+        numero = numero.replace(".", "")
+    try:
+        return float(numero)
+    except ValueError:
+        return None
+
+
+def _normalizar_texto(texto):
+    """(valor, unidade, minimo, maximo) de um texto; números None sem match."""
+    minusculas = texto.lower()
+    unidade_encontrada = _UNIDADE_RE.search(minusculas)
+    unidade = UNIDADES[unidade_encontrada.lastindex - 1][1] if unidade_encontrada else ""
+    partes = _VALOR_RE.search(minusculas)
+    n1 = _para_float(partes["n1"]) if partes else None
+    if n1 is None:
+        return None, unidade, None, None
+
+    escala = 1.0 if unidade == "%" else ESCALAS.get(partes["escala"], 1.0)
+    minimo = (-n1 if partes["sinal"] else n1) * escala
+    n2 = _para_float(partes["n2"])
+    maximo = minimo if n2 is None else n2 * escala
+    return (minimo + maximo) / 2, unidade, minimo, maximo
+
+
+def normalizar_valor(valor):
+    """Versão para um único valor: (float ou None, unidade)."""
+    if valor is None:
+        return None, ""
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return float(valor), ""
+    numero, unidade, _, _ = _normalizar_texto(str(valor))
+    return numero, unidade
@@ -0,0 +1,83 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+
+class RunJournal:
+    """Diário de execução de um PDF, identificado pelo hash do conteúdo.
+
+    Cada evento é uma linha JSON acrescentada (e sincronizada em disco) no
+    momento em que acontece:
+
+    - {"tipo": "etapa", "etapa": ..., "dados": ...}: etapa concluída
+      ("chunks", "metricas", "concluido");
+    - {"tipo": "metrica", "chave": ..., "linha": ...}: linha do CSV de uma
+      métrica já extraída.
+
+    Um processo que morre no meio perde no máximo a métrica em andamento;
+    com --resume o pipeline relê o diário e continua dali. Uma linha
+    truncada pela queda é ignorada.
+    """
+
+    def __init__(self, diretorio, pdf_hash):
+        self.caminho = os.path.join(diretorio, f"{pdf_hash}.jsonl")
+        self.pdf_hash = pdf_hash
+        self._etapas = {}
+        self._metricas = {}
+        self._lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+        self._carregar()
+
+    def _carregar(self):
+        if not os.path.exists(self.caminho):
+            return
+        with open(self.caminho, "r", encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    evento = json.loads(linha)
+                except json.JSONDecodeError:
+                    continue
+                if evento["tipo"] == "etapa":
+                    self._etapas[evento["etapa"]] = evento.get("dados")
+                elif evento["tipo"] == "metrica":
+                    self._metricas[evento["chave"]] = evento["linha"]
+
+    def _acrescentar(self, evento):
+        evento["em"] = datetime.now().isoformat(timespec="seconds")
+        with open(self.caminho, "a", encoding="utf-8") as f:
+            f.write(json.dumps(evento, ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def reiniciar(self):
+        """Descarta o progresso anterior (execução sem --resume)."""
+        with self._lock:
+            self._etapas.clear()
+            self._metricas.clear()
+            if os.path.exists(self.caminho):
+                os.remove(self.caminho)
+
+    def etapa(self, nome):
+        """Dados gravados da etapa, ou None se ela ainda não foi concluída."""
+        return self._etapas.get(nome)
+
+    def concluida(self, nome):
+        return nome in self._etapas
+
+    def concluir_etapa(self, nome, dados=None):
+        with self._lock:
+            self._etapas[nome] = dados
+            self._acrescentar({"tipo": "etapa", "etapa": nome, "dados": dados})
+
+    def metricas_concluidas(self):
+        """{chave: linha} das métricas já extraídas."""
+        return dict(self._metricas)
+
+    def registrar_metrica(self, chave, linha):
+        with self._lock:
+            self._metricas[chave] = linha
+            self._acrescentar({"tipo": "metrica", "chave": chave, "linha": linha})
+
+    def resumo(self):
+        return f"📓 Diário {os.path.basename(self.caminho)}: etapas {sorted(self._etapas) or '-'}, {len(self._metricas)} métricas"
@@ -0,0 +1,158 @@
+import os
+import sqlite3
+import threading
+import time
+
+PENDENTE = "pendente"
+EM_ANDAMENTO = "em_andamento"
+CONCLUIDO = "concluido"
+ERRO = "erro"
+
+
+class WorkQueue:
+    """Fila persistente de PDFs a processar, em SQLite.
+
+    Cada conteúdo (hash do PDF) entra uma única vez: soltar o mesmo arquivo
+    de novo, ou uma cópia com outro nome, não gera um segundo item enquanto
+    o primeiro estiver pendente ou em andamento. A reserva de um item é
+    atômica, então vários workers (threads ou processos) nunca pegam o
+    mesmo PDF. Itens que estavam em andamento
+    quando o processo morreu voltam para a fila com `recuperar_orfaos`.
+
+    Uma falha devolve o item com espera exponencial (`espera_base_s`,
+    dobrando a cada tentativa até `espera_max_s`), para que uma queda curta
+    da API não consuma todas as tentativas em segundos. Itens com erro
+    definitivo voltam à fila quando o arquivo é reenfileirado ou com
+    `reenfileirar_erros` (`daemon retry`).
+    """
+
+    def __init__(self, caminho, max_tentativas=3, espera_base_s=30.0, espera_max_s=3600.0):
+        self.caminho = caminho
+        self.max_tentativas = max_tentativas
+        self.espera_base_s = espera_base_s
+        self.espera_max_s = espera_max_s
+        pasta = os.path.dirname(caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(caminho, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS fila (
+                pdf_hash TEXT PRIMARY KEY,
+                caminho TEXT NOT NULL,
+                status TEXT NOT NULL,
+                tentativas INTEGER NOT NULL DEFAULT 0,
+                erro TEXT,
+                enfileirado_em REAL NOT NULL,
+                iniciado_em REAL,
+                concluido_em REAL,
+                disponivel_em REAL NOT NULL DEFAULT 0
+            )"""
+        )
+        colunas = {linha[1] for linha in self._conn.execute("PRAGMA table_info(fila)")}
+        if "disponivel_em" not in colunas:
+            # Filas criadas antes da espera entre tentativas
+            self._conn.execute("ALTER TABLE fila ADD COLUMN disponivel_em REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_status ON fila (status, enfileirado_em)")
+
+    def enfileirar(self, caminho, pdf_hash):
+        """True se o PDF entrou na fila agora.
+
+        Um conteúdo já concluído volta à fila (o worker o reconhece pelo
+        manifesto e só move o arquivo), e um com erro definitivo ganha novas
+        tentativas; pendente ou em andamento é ignorado.
+        """
+        agora = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                """INSERT INTO fila (pdf_hash, caminho, status, enfileirado_em) VALUES (?, ?, ?, ?)
+                   ON CONFLICT (pdf_hash) DO UPDATE SET
+                       caminho = excluded.caminho, status = excluded.status, tentativas = 0,
+                       erro = NULL, enfileirado_em = excluded.enfileirado_em,
+                       iniciado_em = NULL, concluido_em = NULL, disponivel_em = 0
+                   WHERE fila.status IN (?, ?)""",
+                (pdf_hash, caminho, PENDENTE, agora, CONCLUIDO, ERRO),
+            )
+            return cursor.rowcount > 0
+
+    def reenfileirar_erros(self):
+        """Itens com erro definitivo voltam a pendente, com as tentativas zeradas. Retorna quantos."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE fila SET status = ?, tentativas = 0, disponivel_em = 0 WHERE status = ?",
+                (PENDENTE, ERRO),
+            )
+            return cursor.rowcount
+
+    def reservar(self):
+        """(pdf_hash, caminho) do item pendente mais antigo já fora da espera entre
+        tentativas, marcado em andamento; None se não houver nenhum."""
+        agora = time.time()
+        with self._lock:
+            linha = self._conn.execute(
+                """UPDATE fila SET status = ?, iniciado_em = ?, tentativas = tentativas + 1
+                   WHERE pdf_hash = (
+                       SELECT pdf_hash FROM fila WHERE status = ? AND disponivel_em <= ?
+                       ORDER BY enfileirado_em LIMIT 1
+                   )
+                   RETURNING pdf_hash, caminho""",
+                (EM_ANDAMENTO, agora, PENDENTE, agora),
+            ).fetchone()
+        return tuple(linha) if linha else None
+
+    def concluir(self, pdf_hash):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE fila SET status = ?, erro = NULL, concluido_em = ? WHERE pdf_hash = ?",
+                (CONCLUIDO, time.time(), pdf_hash),
+            )
+
+    def falhar(self, pdf_hash, erro, definitivo=False):
+        """Devolve o item à fila após a espera da tentativa, ou o marca com erro
+        definitivo após `max_tentativas` (ou já, com `definitivo`, para falhas
+        que uma nova tentativa não resolve)."""
+        tentativas_limite = 0 if definitivo else self.max_tentativas
+        agora = time.time()
+        with self._lock:
+            linha = self._conn.execute("SELECT tentativas FROM fila WHERE pdf_hash = ?", (pdf_hash,)).fetchone()
+            tentativas = linha[0] if linha else 1
+            espera = min(self.espera_max_s, self.espera_base_s * 2 ** max(0, tentativas - 1))
+            self._conn.execute(
+                """UPDATE fila SET erro = ?, concluido_em = ?, disponivel_em = ?,
+                       status = CASE WHEN tentativas >= ? THEN ? ELSE ? END
+                   WHERE pdf_hash = ?""",
+                (str(erro), agora, agora + espera, tentativas_limite, ERRO, PENDENTE, pdf_hash),
+            )
+
+    def recuperar_orfaos(self):
+        """Itens em andamento de um processo anterior voltam a pendente. Retorna quantos."""
+        with self._lock:
+            cursor = self._conn.execute("UPDATE fila SET status = ? WHERE status = ?", (PENDENTE, EM_ANDAMENTO))
+            return cursor.rowcount
+
+    def item(self, pdf_hash):
+        """(caminho, status) do item com este conteúdo, ou None."""
+        with self._lock:
+            linha = self._conn.execute("SELECT caminho, status FROM fila WHERE pdf_hash = ?", (pdf_hash,)).fetchone()
+        return tuple(linha) if linha else None
+
+    def contagens(self):
+        with self._lock:
+            linhas = self._conn.execute("SELECT status, COUNT(*) FROM fila GROUP BY status").fetchall()
+        contagens = {status: 0 for status in (PENDENTE, EM_ANDAMENTO, CONCLUIDO, ERRO)}
+        contagens.update(dict(linhas))
+        return contagens
+
+    def erros(self, limite=10):
+        with self._lock:
+            linhas = self._conn.execute(
+                "SELECT caminho, tentativas, erro FROM fila WHERE status = ? ORDER BY concluido_em DESC LIMIT ?",
+                (ERRO, limite),
+            ).fetchall()
+        return [{"caminho": c, "tentativas": t, "erro": e} for c, t, e in linhas]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,92 @@
+"""Extração concorrente contra um modelo de chat falso com latência injetada.
+
+Uso: python -m teste.benchmark_concorrencia [latencia_s] [concorrencia]
+
+Nenhuma chamada de rede é feita: o chat responde JSON fixo depois de
+`latencia_s` segundos e, de vez em quando, levanta um erro 429 para exercitar
+as retentativas. Uma métrica sempre falha, para conferir que o erro fica
+isolado. O script compara a execução serial com a concorrente e confere que
+as linhas saem na mesma ordem.
+"""
+import json
+import random
+import sys
+import threading
+import time
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.agents.ai_processor import ESGMetricProcessor
+
+N_METRICAS = 24
+
+
+class ErroRateLimitFalso(Exception):
+    status_code = 429
+
+
+class ChatFalsoComLatencia(BaseChatModel):
+    latencia: float = 0.2
+    taxa_erro_429: float = 0.1
+    chamadas: int = 0
+
+    @property
+    def _llm_type(self):
+        return "chat-falso"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        texto = messages[-1].content
+        self.chamadas += 1
+        time.sleep(self.latencia)
+        if "Retire pelo menos 20 métricas" in texto:
+            resposta = {f"metrica_{i:02d}": f"Qual o valor da métrica {i:02d}?" for i in range(N_METRICAS)}
+        else:
+            if random.random() < self.taxa_erro_429:
+                raise ErroRateLimitFalso("429 Too Many Requests")
+            if "Qual o valor da métrica 13" in texto:
+                raise ValueError("falha simulada")
+            numero = texto.split("Qual o valor da métrica ")[1][:2]
+            resposta = {"valor": f"{numero},5%", "trecho_original": f"trecho da métrica {numero}"}
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=json.dumps(resposta)))])
+
+
+def executar(concorrencia, latencia):
+    processor = ESGMetricProcessor("sem-chave", max_concorrencia=concorrencia, requisicoes_por_minuto=600)
+    processor.model = ChatFalsoComLatencia(latencia=latencia)
+    processor.embeddings = DeterministicFakeEmbedding(size=64)
+    # Evita que o Chroma em memória reaproveite a coleção da execução anterior
+    processor.create_vector_db = lambda documentos, doc_id=None: _vector_db(processor, documentos)
+
+    chunks = [{"contexto": f"...{i},5% das mulheres na métrica {i:02d}...", "pagina": i + 1} for i in range(N_METRICAS)]
+    inicio = time.perf_counter()
+    linhas = processor._extrair_texto_estruturado_csv(chunks)
+    return linhas, time.perf_counter() - inicio
+
+
+def _vector_db(processor, documentos):
+    from langchain_core.vectorstores import InMemoryVectorStore
+    return InMemoryVectorStore.from_documents(documentos, processor.embeddings)
+
+
+def main():
+    latencia = float(sys.argv[1]) if len(sys.argv) > 1 else 0.2
+    concorrencia = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    random.seed(0)
+
+    serial, t_serial = executar(1, latencia)
+    concorrente, t_concorrente = executar(concorrencia, latencia)
+
+    ordem_serial = [l["Dado Extraído"] for l in serial]
+    ordem_concorrente = [l["Dado Extraído"] for l in concorrente]
+    print(f"\n⏱️ Serial: {t_serial:.1f}s | Concorrência {concorrencia}: {t_concorrente:.1f}s "
+          f"({t_serial / t_concorrente:.1f}x)")
+    print(f"📋 Linhas: {len(serial)} x {len(concorrente)} (1 métrica falha de propósito)")
+    print(f"🔢 Mesma ordem: {ordem_serial == ordem_concorrente}")
+    print(f"🧵 Threads ativas ao final: {threading.active_count()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Conexões TCP abertas com e sem o ClientRegistry.
+
+Uso: python -m teste.benchmark_conexoes [n_arquivos] [chamadas_por_arquivo]
+
+Sobe um servidor local que imita /chat/completions e /embeddings da OpenAI
+e conta quantas conexões ele aceita. Cada "arquivo" cria um
+ESGMetricProcessor novo (como o main.py faz) e faz algumas chamadas de
+chat e de embeddings: sem registro, cada processador abre seu próprio pool;
+com registro, todos reaproveitam as mesmas conexões.
+"""
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.agents.ai_processor import ESGMetricProcessor
+from src.agents.client_registry import ClientRegistry
+
+CONEXOES = []
+
+
+class ServidorFalso(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        CONEXOES.append(self.client_address)
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        pedido = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path.endswith("/embeddings"):
+            entradas = pedido["input"] if isinstance(pedido["input"], list) else [pedido["input"]]
+            corpo = {
+                "object": "list", "model": pedido["model"],
+                "data": [{"object": "embedding", "index": i, "embedding": [0.1] * 8} for i in range(len(entradas))],
+                "usage": {"prompt_tokens": 1, "total_tokens": 1},
+            }
+        else:
+            corpo = {
+                "id": "x", "object": "chat.completion", "created": 0, "model": pedido["model"],
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "{}"}}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }
+        dados = json.dumps(corpo).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+
+def rodar(n_arquivos, chamadas, registro):
+    CONEXOES.clear()
+    for _ in range(n_arquivos):
+        processor = ESGMetricProcessor("sk-teste", registro_clientes=registro, backend_vetorial="numpy")
+        # Sem tokenização local (o tiktoken baixaria o vocabulário da internet)
+        processor.embeddings.check_embedding_ctx_length = False
+        for _ in range(chamadas):
+            processor.model.invoke("ping")
+            processor.embeddings.embed_query("ping")
+    return len(CONEXOES)
+
+
+def main():
+    n_arquivos = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    chamadas = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), ServidorFalso)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{servidor.server_address[1]}/v1"
+
+    sem_registro = rodar(n_arquivos, chamadas, None)
+    registro = ClientRegistry()
+    com_registro = rodar(n_arquivos, chamadas, registro)
+    registro.fechar()
+    servidor.shutdown()
+
+    print(f"🔌 {n_arquivos} arquivos x {chamadas} chamadas de chat + {chamadas} de embeddings")
+    print(f"   Sem registro: {sem_registro} conexões abertas")
+    print(f"   Com registro: {com_registro} conexões abertas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Micro-benchmark: reconstrução de layout antiga x nova em páginas reais.
+
+Uso: python -m teste.benchmark_layout caminho/relatorio.pdf [repeticoes]
+
+As palavras de cada página são extraídas uma única vez, assim só o tempo de
+agrupamento em colunas/linhas é medido. O script também confere que as duas
+versões produzem exatamente o mesmo texto.
+"""
+import sys
+import time
+
+import pdfplumber
+
+from src.extractors.layout_engine import montar_texto
+
+
+def montar_texto_legado(words):
+    # Cópia fiel da implementação original de ESGDocumentLoader._extrair_texto_estruturado
+    if not words: return ""
+
+    words_sorted = sorted(words, key=lambda x: x['x0'])
+    colunas = []
+    if words_sorted:
+        curr_col = [words_sorted[0]]
+        for i in range(1, len(words_sorted)):
+            if words_sorted[i]['x0'] - words_sorted[i-1]['x1'] > 20:
+                colunas.append(curr_col)
+                curr_col = []
+            curr_col.append(words_sorted[i])
+        colunas.append(curr_col)
+
+    texto_final = []
+    for col in colunas:
+        linhas = {}
+        for w in col:
+            y = round(w['top'])
+            found = False
+            for r_y in linhas.keys():
+                if abs(y - r_y) <= 3:
+                    linhas[r_y].append(w); found = True; break
+            if not found: linhas[y] = [w]
+
+        texto_col = [" ".join([w['text'] for w in sorted(linhas[y], key=lambda x: x['x0'])])
+                     for y in sorted(linhas.keys())]
+        texto_final.append("\n".join(texto_col))
+
+    return "\n\n[QUEBRA_DE_COLUNA]\n\n".join(texto_final)
+
+
+def cronometrar(funcao, paginas, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for words in paginas:
+            funcao(words)
+    return time.perf_counter() - inicio
+
+
+def main():
+    pdf_path = sys.argv[1]
+    repeticoes = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    with pdfplumber.open(pdf_path) as pdf:
+        paginas = [page.extract_words(x_tolerance=3, y_tolerance=3) for page in pdf.pages]
+
+    divergentes = [i + 1 for i, words in enumerate(paginas) if montar_texto(words) != montar_texto_legado(words)]
+    total_palavras = sum(len(w) for w in paginas)
+    print(f"📄 {len(paginas)} páginas, {total_palavras} palavras")
+    print(f"🔎 Páginas com texto divergente: {divergentes or 'nenhuma'}")
+
+    t_legado = cronometrar(montar_texto_legado, paginas, repeticoes)
+    t_novo = cronometrar(montar_texto, paginas, repeticoes)
+    print(f"⏱️ Legado: {t_legado / repeticoes * 1000:.1f} ms por documento")
+    print(f"⏱️ Novo:   {t_novo / repeticoes * 1000:.1f} ms por documento")
+    print(f"🚀 Ganho: {t_legado / t_novo:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Benchmark de memória: pico de RSS x número de páginas lidas.
+
+Uso: python -m teste.benchmark_memoria caminho/relatorio.pdf [50,100,200,...]
+
+Cada medição roda em um processo novo (spawn), então o pico de RSS reflete
+apenas aquela leitura. O pré-filtro é desligado para que todas as páginas
+passem pelo pdfplumber, que é onde a memória cresce.
+"""
+import json
+import multiprocessing
+import resource
+import sys
+import time
+
+from src.extractors.document_loader import ESGDocumentLoader
+
+
+def medir(pdf_path, n_paginas, memoria_limitada, fila):
+    with open("src/utils/esg_indicadores.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    loader = ESGDocumentLoader(config, prefiltro=False, memoria_limitada=memoria_limitada)
+
+    inicio = time.perf_counter()
+    total_chunks = sum(1 for _ in loader.iter_chunks(pdf_path, paginas=range(n_paginas)))
+    duracao = time.perf_counter() - inicio
+    # ru_maxrss vem em KB no Linux
+    pico_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    fila.put((pico_mb, duracao, total_chunks))
+
+
+def main():
+    pdf_path = sys.argv[1]
+    tamanhos = [int(n) for n in sys.argv[2].split(",")] if len(sys.argv) > 2 else [25, 50, 100, 200, 300]
+
+    ctx = multiprocessing.get_context("spawn")
+    print(f"{'páginas':>8} | {'modo':<16} | {'pico RSS (MB)':>13} | {'tempo (s)':>9} | {'chunks':>7}")
+    for n_paginas in tamanhos:
+        for memoria_limitada in (False, True):
+            fila = ctx.Queue()
+            processo = ctx.Process(target=medir, args=(pdf_path, n_paginas, memoria_limitada, fila))
+            processo.start()
+            pico_mb, duracao, total_chunks = fila.get()
+            processo.join()
+            modo = "memória limitada" if memoria_limitada else "padrão"
+            print(f"{n_paginas:>8} | {modo:<16} | {pico_mb:>13.1f} | {duracao:>9.1f} | {total_chunks:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""Normalização numérica: regra antiga (valor a valor) x normalizar_valor x normalizar_serie.
+
+Uso: python -m teste.benchmark_normalizacao [n_valores]
+
+Gera valores no estilo dos relatórios (milhar com ponto, decimal com
+vírgula, percentuais, tCO2e, negativos e faixas), mede o tempo das
+abordagens e conta quantos valores cada uma acerta contra o esperado.
+Os casos gerados são limpos; CASOS_DIFICEIS cobre textos que o LLM
+devolve de fato (traço solto, "e", códigos GRI, períodos) e é conferido à parte.
+"""
+import random
+import re
+import sys
+import time
+
+import pandas as pd
+
+from src.utils.numeric_normalizer import normalizar_serie, normalizar_valor
+
+# (texto, valor esperado): traços e "e" que não são sinal nem faixa
+CASOS_DIFICEIS = [
+    ("Mulheres – 36%", 36.0),
+    ("mulheres - 36%", 36.0),
+    ("36% e 64%", 36.0),
+    ("36 e 40", 36.0),
+    ("GRI 405-1", 405.0),
+    ("2023-2024", 2023.0),
+    ("-0,7%", -0.7),
+    ("−1,5 tCO2e", -1.5),
+    ("28-33%", 30.5),
+    ("10 – 20 MWh", 15.0),
+    ("30 a 40%", 35.0),
+    ("5 a 10 mil", 7500.0),
+    ("1,2 até 1,5 mil tCO2e", 1350.0),
+]
+
+
+def formatar_antigo(valor):
+    # Regra anterior do ESGMetricProcessor.formatar_para_numero
+    if valor is None:
+        return 0
+    texto = str(valor).replace(",", ".").strip()
+    numeros = re.findall(r"[-+]?\d*\.\d+|\d+", texto)
+    if not numeros:
+        return 0
+    num_final = float(numeros[0])
+    if "%" in texto:
+        return num_final / 100 if num_final > 1 else num_final
+    return num_final
+
+
+def _pt_br(numero, casas):
+    inteiro, _, decimal = f"{abs(numero):,.{casas}f}".partition(".")
+    texto = inteiro.replace(",", ".") + ("," + decimal if casas else "")
+    return ("-" if numero < 0 else "") + texto
+
+
+def gerar(n, semente=0):
+    """[(texto, valor esperado)] com os formatos encontrados nos relatórios."""
+    rng = random.Random(semente)
+    casos = []
+    for _ in range(n):
+        tipo = rng.randrange(8)
+        if tipo == 0:
+            v = round(rng.uniform(0, 100), 1)
+            casos.append((f"{_pt_br(v, 1)}%", v))
+        elif tipo == 1:
+            v = rng.randrange(1_000, 10_000_000)
+            casos.append((_pt_br(v, 0), float(v)))
+        elif tipo == 2:
+            v = round(rng.uniform(1_000, 1_000_000), 2)
+            casos.append((f"{_pt_br(v, 2)} tCO2e", v))
+        elif tipo == 3:
+            v = round(rng.uniform(-10, 0), 1)
+            casos.append((f"{_pt_br(v, 1)}%", v))
+        elif tipo == 4:
+            a = rng.randrange(10, 40)
+            b = a + rng.randrange(1, 20)
+            casos.append((f"{a}% a {b}%", (a + b) / 2))
+        elif tipo == 5:
+            v = round(rng.uniform(1, 99), 1)
+            casos.append((f"{_pt_br(v, 1)} mil", v * 1000))
+        elif tipo == 6:
+            # Faixa com "%" só no fim ("30 a 40%")
+            a = rng.randrange(10, 40)
+            b = a + rng.randrange(1, 20)
+            casos.append((f"{a} {rng.choice(['a', 'até'])} {b}%", (a + b) / 2))
+        else:
+            # Faixa com escala aplicada aos dois lados ("5 a 10 mil")
+            a = rng.randrange(1, 50)
+            b = a + rng.randrange(1, 50)
+            casos.append((f"{a} a {b} mil", (a + b) / 2 * 1000))
+    return casos
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    casos = gerar(n)
+    textos = pd.Series([t for t, _ in casos], dtype=object)
+    esperado = pd.Series([v for _, v in casos])
+
+    inicio = time.perf_counter()
+    antigo = pd.Series([formatar_antigo(t) for t in textos])
+    t_antigo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    escalar = pd.Series([normalizar_valor(t)[0] for t in textos])
+    t_escalar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    novo = normalizar_serie(textos)
+    t_novo = time.perf_counter() - inicio
+
+    acertos_antigo = ((antigo - esperado).abs() < 1e-6).sum()
+    acertos_escalar = ((escalar - esperado).abs() < 1e-6).sum()
+    acertos_novo = ((novo["valor"] - esperado).abs() < 1e-6).sum()
+    print(f"🔢 {n} valores")
+    print(f"   Regra antiga (loop):       {t_antigo:.2f}s, {acertos_antigo / n:.1%} corretos")
+    print(f"   normalizar_valor (loop):   {t_escalar:.2f}s, {acertos_escalar / n:.1%} corretos")
+    print(f"   normalizar_serie (lote):   {t_novo:.2f}s, {acertos_novo / n:.1%} corretos")
+    print(f"   Unidades: {novo['unidade'].replace('', '(nenhuma)').value_counts().to_dict()}")
+    erros = textos[(novo["valor"] - esperado).abs() >= 1e-6]
+    if len(erros):
+        print(f"   Exemplos de divergência: {erros.head(5).tolist()}")
+
+    dificeis = normalizar_serie(pd.Series([t for t, _ in CASOS_DIFICEIS], dtype=object))["valor"]
+    falhas = [
+        (texto, obtido)
+        for (texto, esperado_caso), obtido in zip(CASOS_DIFICEIS, dificeis)
+        if abs(obtido - esperado_caso) >= 1e-6 or abs(normalizar_valor(texto)[0] - esperado_caso) >= 1e-6
+    ]
+    acertos_dificeis = len(CASOS_DIFICEIS) - len(falhas)
+    print(f"   Casos difíceis: {acertos_dificeis}/{len(CASOS_DIFICEIS)} corretos")
+    if falhas:
+        print(f"   Divergências: {falhas}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Pipeline de extração ponta a ponta sem rede, gravando e reproduzindo um cassete.
+
+Uso: python -m teste.benchmark_replay data/output/chunks_empresa_X.jsonl [latencia_s] [concorrencia] [--openai]
+
+1. Grava: roda o processador com o chat/embeddings falsos (ou os da OpenAI,
+   com --openai e OPENAI_API_KEY) e grava cada resposta num cassete temporário.
+2. Reproduz: roda de novo só a partir do cassete, com `latencia_s` por
+   chamada, em série e com `concorrencia` threads, e confere que as linhas
+   saem idênticas às da gravação.
+"""
+import os
+import sys
+import tempfile
+import time
+
+import dotenv
+
+from src.agents import backends
+from src.agents.ai_processor import ESGMetricProcessor
+from src.extractors.chunk_dedup import ChunkDeduplicator
+from src.utils.data_repository import ChunkJsonlWriter
+from src.utils.metric_catalog import MetricCatalog
+
+
+def gravar(chunks, caminho_cassete, usar_openai):
+    processor = ESGMetricProcessor(
+        os.getenv("OPENAI_API_KEY"), backend="gravar" if usar_openai else "falso",
+        caminho_cassete=caminho_cassete, backend_vetorial="numpy", catalogo=MetricCatalog(),
+    )
+    if not usar_openai:
+        # Mesmo caminho de gravação do backend "gravar", mas sobre os modelos falsos
+        cassete = backends.Cassete(caminho_cassete)
+        processor.model = backends.ChatGravado(modelo=processor.model, cassete=cassete, model_name="gpt-4o")
+        processor.embeddings = backends.EmbeddingsGravados(processor.embeddings, cassete, "text-embedding-ada-002")
+    return processor._extrair_texto_estruturado_csv(chunks)
+
+
+def reproduzir(chunks, caminho_cassete, latencia, concorrencia):
+    processor = ESGMetricProcessor(
+        None, backend="reproduzir", caminho_cassete=caminho_cassete, latencia_simulada=latencia,
+        backend_vetorial="numpy", catalogo=MetricCatalog(), max_concorrencia=concorrencia,
+    )
+    inicio = time.perf_counter()
+    linhas = processor._extrair_texto_estruturado_csv(chunks)
+    return linhas, time.perf_counter() - inicio
+
+
+def main():
+    dotenv.load_dotenv()
+    usar_openai = "--openai" in sys.argv
+    argumentos = [a for a in sys.argv[1:] if a != "--openai"]
+    # Mesma entrada que o main.py entrega ao processador
+    chunks = ChunkDeduplicator().deduplicar(list(ChunkJsonlWriter.read(argumentos[0])))
+    latencia = float(argumentos[1]) if len(argumentos) > 1 else 0.3
+    concorrencia = int(argumentos[2]) if len(argumentos) > 2 else 8
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho_cassete = os.path.join(pasta, "cassete.jsonl")
+        gravadas = gravar(chunks, caminho_cassete, usar_openai)
+        serial, t_serial = reproduzir(chunks, caminho_cassete, latencia, 1)
+        concorrente, t_concorrente = reproduzir(chunks, caminho_cassete, latencia, concorrencia)
+
+    print(f"\n📼 {len(chunks)} chunks, {len(gravadas)} linhas gravadas, latência simulada {latencia}s")
+    print(f"⏱️ Reprodução serial: {t_serial:.1f}s | concorrência {concorrencia}: {t_concorrente:.1f}s")
+    print(f"🔁 Linhas idênticas à gravação: {serial == gravadas and concorrente == gravadas}")
+
+
+if __name__ == "__main__":
+    main()
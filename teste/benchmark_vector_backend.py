@@ -0,0 +1,101 @@
+"""Compara o índice NumPy com o Chroma em 100, 1k e 10k chunks.
+
+Uso: python -m teste.benchmark_vector_backend [dimensao] [n_consultas]
+
+Mede o tempo de import de cada backend (num interpretador novo), o tempo de
+construção do índice e a latência média de consulta (k=5). Os embeddings são
+calculados antes e servidos de um dicionário, então os tempos medem só o
+índice, não o modelo de embeddings. Também confere se os dois backends
+devolvem os mesmos documentos.
+"""
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+TAMANHOS = [100, 1_000, 10_000]
+K = 5
+
+IMPORTS = {
+    "numpy": "from src.agents.vector_index import NumpyVectorIndex",
+    "chroma": "from langchain_community.vectorstores import Chroma; import chromadb",
+}
+
+
+class EmbeddingsPreCalculados(Embeddings):
+    """Vetores aleatórios fixos por texto, gerados uma vez fora da medição."""
+
+    def __init__(self, textos, dimensao):
+        rng = np.random.default_rng(0)
+        self.vetores = {t: v.tolist() for t, v in zip(textos, rng.normal(size=(len(textos), dimensao)))}
+
+    def embed_documents(self, texts):
+        return [self.vetores[t] for t in texts]
+
+    def embed_query(self, text):
+        return self.vetores[text]
+
+
+def medir_import(backend):
+    codigo = f"import time; t = time.perf_counter(); {IMPORTS[backend]}; print(time.perf_counter() - t)"
+    saida = subprocess.run([sys.executable, "-W", "ignore", "-c", codigo], capture_output=True, text=True, check=True)
+    return float(saida.stdout.strip().splitlines()[-1])
+
+
+def construir(backend, documentos, embeddings):
+    if backend == "numpy":
+        from src.agents.vector_index import NumpyVectorIndex
+        return NumpyVectorIndex.from_documents(documentos, embeddings)
+    from langchain_community.vectorstores import Chroma
+    # Métrica de cosseno para os dois backends ranquearem igual
+    return Chroma.from_documents(
+        documentos, embeddings, collection_name=f"bench_{uuid.uuid4().hex[:8]}",
+        collection_metadata={"hnsw:space": "cosine"},
+    )
+
+
+def main():
+    dimensao = int(sys.argv[1]) if len(sys.argv) > 1 else 1536
+    n_consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    print("📦 Tempo de import")
+    for backend in IMPORTS:
+        print(f"   {backend:<7} {medir_import(backend) * 1000:8.0f} ms")
+
+    print(f"\n{'chunks':>7} {'backend':<8} {'construção':>12} {'consulta (média)':>17} {'mesmos docs':>12}")
+    for n in TAMANHOS:
+        textos = [f"chunk {i}" for i in range(n)]
+        consultas = [f"consulta {i}" for i in range(n_consultas)]
+        embeddings = EmbeddingsPreCalculados(textos + consultas, dimensao)
+        documentos = [Document(page_content=t, metadata={"pg": i % 300 + 1}) for i, t in enumerate(textos)]
+
+        resultados = {}
+        for backend in ("numpy", "chroma"):
+            inicio = time.perf_counter()
+            indice = construir(backend, documentos, embeddings)
+            t_construcao = time.perf_counter() - inicio
+
+            latencias, recuperados = [], []
+            for consulta in consultas:
+                inicio = time.perf_counter()
+                docs = indice.similarity_search(consulta, k=K)
+                latencias.append(time.perf_counter() - inicio)
+                recuperados.append([d.page_content for d in docs])
+            resultados[backend] = recuperados
+
+            iguais = ""
+            if backend == "chroma":
+                # O HNSW do Chroma é aproximado; em corpora grandes pode divergir
+                acertos = sum(a == b for a, b in zip(resultados["numpy"], recuperados))
+                iguais = f"{acertos}/{n_consultas}"
+            print(f"{n:>7} {backend:<8} {t_construcao * 1000:>10.0f} ms "
+                  f"{statistics.mean(latencias) * 1000:>14.2f} ms {iguais:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Tokens de contexto por prompt de extração: concatenação simples x ContextBuilder.
+
+Uso: python -m teste.comparar_contexto caminho/relatorio.pdf [k] [orcamento_tokens] [--sem-dedup]
+
+Extrai e deduplica os chunks como o main.py (ou não, com --sem-dedup),
+indexa com embeddings lexicais locais (hash de palavras, sem chamada de
+rede) e recupera k chunks para uma pergunta por subtema do
+esg_indicadores.json. Para cada pergunta compara os
+tokens do contexto antigo (chunks concatenados) com os do ContextBuilder.
+"""
+import json
+import re
+import sys
+import zlib
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.agents.ai_processor import ESGMetricProcessor
+from src.extractors.chunk_dedup import ChunkDeduplicator
+from src.extractors.document_loader import ESGDocumentLoader
+
+
+class EmbeddingsLexicais(Embeddings):
+    """Bag-of-words com hash em 512 dimensões: recuperação razoável sem API."""
+
+    def _vetor(self, texto):
+        vetor = np.zeros(512, dtype=np.float32)
+        for palavra in re.findall(r"\w+", texto.lower()):
+            vetor[zlib.crc32(palavra.encode()) % 512] += 1
+        return vetor.tolist()
+
+    def embed_documents(self, texts):
+        return [self._vetor(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._vetor(text)
+
+
+def main():
+    sem_dedup = "--sem-dedup" in sys.argv
+    argumentos = [a for a in sys.argv[1:] if a != "--sem-dedup"]
+    pdf_path = argumentos[0]
+    k = int(argumentos[1]) if len(argumentos) > 1 else 5
+    orcamento = int(argumentos[2]) if len(argumentos) > 2 else 1500
+
+    with open("src/utils/esg_indicadores.json", "r", encoding="utf-8") as f:
+        config = json.load(f)
+    chunks = list(ESGDocumentLoader(config).iter_chunks(pdf_path, config))
+    if not sem_dedup:
+        chunks = ChunkDeduplicator().deduplicar(chunks)
+
+    processor = ESGMetricProcessor("sem-chave", backend_vetorial="numpy", orcamento_tokens_contexto=orcamento)
+    processor.embeddings = EmbeddingsLexicais()
+    retriever = processor._criar_retriever(chunks)
+    retriever.search_kwargs["k"] = k
+
+    perguntas = [
+        f"Qual o valor de {subtema} ({dados['id_dashboard']}, {gri})?"
+        for gri, dados in config.items() for subtema in dados["subtemas"]
+    ]
+    total_bruto = total_compacto = 0
+    print(f"{'pergunta':<60} {'bruto':>6} {'compacto':>9} {'páginas':>8}")
+    for pergunta, docs in zip(perguntas, processor.recuperar_em_lote(perguntas, retriever)):
+        _, usados, bruto, compacto = processor._montar_contexto(docs)
+        total_bruto += bruto
+        total_compacto += compacto
+        paginas = ",".join(sorted({str(d.metadata["pg"]) for d in usados}))
+        print(f"{pergunta[:60]:<60} {bruto:>6} {compacto:>9} {paginas:>8}")
+
+    economia = 1 - total_compacto / total_bruto if total_bruto else 0
+    print(f"\n📉 {len(chunks)} chunks, {len(perguntas)} perguntas, k={k}: "
+          f"{total_bruto} → {total_compacto} tokens de contexto ({economia:.0%} a menos)")
+
+
+if __name__ == "__main__":
+    main()
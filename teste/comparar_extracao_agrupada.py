@@ -0,0 +1,57 @@
+"""Compara a extração agrupada com a individual sobre o mesmo conjunto de métricas.
+
+Uso: python -m teste.comparar_extracao_agrupada data/output/chunks_empresa_X.jsonl
+
+A descoberta roda uma única vez e as duas estratégias extraem exatamente as
+mesmas métricas, do mesmo retriever. O script mostra chamadas e tokens de
+prompt de cada caminho e a concordância dos valores (o caminho individual é
+tratado como referência).
+"""
+import json
+import os
+import sys
+
+import dotenv
+
+from src.agents.ai_processor import ESGMetricProcessor
+from src.utils.data_repository import ChunkJsonlWriter
+
+
+def carregar_chunks(caminho):
+    if caminho.endswith(".jsonl"):
+        return list(ChunkJsonlWriter.read(caminho))
+    with open(caminho, "r", encoding="utf-8") as f:
+        return json.load(f)["chunks"]
+
+
+def main():
+    dotenv.load_dotenv()
+    chunks = carregar_chunks(sys.argv[1])
+    processor = ESGMetricProcessor(os.getenv("OPENAI_API_KEY"))
+
+    retriever = processor._criar_retriever(chunks)
+    metricas = processor.descobrir_metricas(retriever)
+    print(f"🧭 {len(metricas)} métricas descobertas")
+
+    individual = processor.extrair_metricas(metricas, retriever, modo="individual")
+    agrupado = processor.extrair_metricas(metricas, retriever, modo="agrupado")
+    relatorio = processor.ultimo_relatorio_agrupamento
+
+    valores_individual = {l["Dado Extraído"]: l["Valor"] for l in individual}
+    valores_agrupado = {l["Dado Extraído"]: l["Valor"] for l in agrupado}
+    comuns = [m for m in valores_individual if m in valores_agrupado]
+    iguais = [m for m in comuns if abs(valores_individual[m] - valores_agrupado[m]) < 1e-6]
+
+    print("\n📊 Resultado")
+    print(f"   Chamadas: {relatorio['chamadas_individual']} → {relatorio['chamadas_agrupado']} "
+          f"({relatorio['grupos']} grupos)")
+    print(f"   Tokens de prompt: ~{relatorio['tokens_prompt_individual']} → ~{relatorio['tokens_prompt_agrupado']}")
+    print(f"   Concordância: {len(iguais)}/{len(comuns)} métricas com o mesmo valor "
+          f"({len(iguais) / len(comuns):.0%})" if comuns else "   Nenhuma métrica em comum")
+    for m in comuns:
+        if m not in iguais:
+            print(f"   ≠ {m}: individual={valores_individual[m]} agrupado={valores_agrupado[m]}")
+
+
+if __name__ == "__main__":
+    main()